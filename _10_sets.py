@@ -13,13 +13,31 @@ Examples: {1, 2, 3}, {'apple', 'banana'}, {1, 'hello', 3.14}, set()
 """
 
 import sys
+import time
 import timeit
+import threading
+import tracemalloc
+import multiprocessing
 import random
 import itertools
 import operator
-from collections import Counter, defaultdict
+import bisect
+import heapq
+import math
+from collections import Counter, OrderedDict, defaultdict
+import functools
 from functools import reduce
 import copy
+import pickle
+import mmap
+import struct
+import os
+import tempfile
+import zlib
+import csv
+import json
+import hashlib
+from array import array
 
 print("=" * 70)
 print("🎯 Complete Guide to Python Sets")
@@ -635,6 +653,276 @@ print(f"Jaccard(X, Y): {jaccard_similarity(set_x, set_y):.3f}")
 print(f"Jaccard(X, Z): {jaccard_similarity(set_x, set_z):.3f}")
 print(f"Jaccard(Y, Z): {jaccard_similarity(set_y, set_z):.3f}")
 
+# All-pairs similarity join: every pair with Jaccard >= threshold, no N^2 loop
+def _prepare_similarity_join(sets, threshold):
+    """Rank tokens rarest-first, order sets by size and index their prefixes
+    
+    Two sets can only reach the threshold if they share a token within
+    their first |x| - ceil(threshold * |x|) + 1 rarest tokens (prefix filter).
+    """
+    frequencies = Counter(token for s in sets for token in s)
+    rank = {token: position for position, (token, _) in
+            enumerate(sorted(frequencies.items(), key=lambda item: (item[1], repr(item[0]))))}
+    order = sorted(range(len(sets)), key=lambda i: len(sets[i]))
+    records = [(i, sorted(rank[token] for token in sets[i])) for i in order]
+    prefix_index = defaultdict(list)  # token rank -> record positions, ascending
+    for position, (_, tokens) in enumerate(records):
+        for token in tokens[:_prefix_length(len(tokens), threshold)]:
+            prefix_index[token].append(position)
+    return records, prefix_index
+
+def _prefix_length(size, threshold):
+    """Number of rarest tokens that must be indexed/probed for a set of this size"""
+    return size - math.ceil(threshold * size - 1e-9) + 1 if size else 0
+
+def _probe_similarity_join(state, positions):
+    """Candidates for the records at positions among smaller earlier records, verified"""
+    sets, records, prefix_index, threshold = state
+    matches = []
+    for position in positions:
+        i, tokens = records[position]
+        min_size = threshold * len(tokens)
+        candidates = set()
+        for token in tokens[:_prefix_length(len(tokens), threshold)]:
+            for other in prefix_index[token]:
+                if other >= position:
+                    break  # Only pair with records processed earlier
+                if len(records[other][1]) >= min_size - 1e-9:  # Length filter
+                    candidates.add(other)
+        for other in candidates:
+            j = records[other][0]
+            score = jaccard_similarity(sets[i], sets[j])
+            if score >= threshold:
+                matches.append((min(i, j), max(i, j), score))
+    return matches
+
+_join_state = None
+
+def _init_join_worker(state):
+    """Pool initializer: keep the prepared join state in each worker"""
+    global _join_state
+    _join_state = state
+
+def _probe_join_chunk(positions):
+    """Probe one chunk of records inside a worker"""
+    return _probe_similarity_join(_join_state, positions)
+
+def all_pairs_similarity(sets, threshold=0.5, processes=1, chunk_size=1000):
+    """Yield (i, j, jaccard) for every pair of sets with jaccard >= threshold
+    
+    AllPairs-style prefix and length filtering keeps the candidate pairs
+    close to the true matches; with processes > 1 candidate generation and
+    verification run in a multiprocessing pool over chunks of records.
+    """
+    if not 0 < threshold <= 1:
+        raise ValueError("threshold must be in (0, 1]")
+    sets = [s if isinstance(s, (set, frozenset)) else set(s) for s in sets]
+    records, prefix_index = _prepare_similarity_join(sets, threshold)
+    state = (sets, records, prefix_index, threshold)
+    chunks = [range(start, min(start + chunk_size, len(records)))
+              for start in range(0, len(records), chunk_size)]
+    if processes == 1:
+        for chunk in chunks:
+            yield from _probe_similarity_join(state, chunk)
+        return
+    with multiprocessing.Pool(processes, initializer=_init_join_worker, initargs=(state,)) as pool:
+        for matches in pool.imap_unordered(_probe_join_chunk, chunks):
+            yield from matches
+
+print(f"\n🤝 All-Pairs Similarity Join:")
+tag_sets = [{"python", "sets", "tutorial"}, {"python", "sets", "guide"}, {"java", "streams"},
+            {"python", "sets", "tutorial", "advanced"}, {"java", "streams", "guide"}]
+for i, j, score in sorted(all_pairs_similarity(tag_sets, threshold=0.5)):
+    print(f"  sets {i} and {j}: Jaccard {score:.3f}")
+
+# MinHash + LSH: approximate Jaccard search without comparing every pair
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 64) - 1
+
+def stable_hash64(item):
+    """64-bit hash that is the same in every process (unlike hash() on str)"""
+    digest = hashlib.blake2b(repr(item).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+class MinHash:
+    """MinHash signatures: P(sig1[i] == sig2[i]) equals Jaccard(set1, set2)"""
+    
+    def __init__(self, num_perm=128, seed=1):
+        self.num_perm = num_perm
+        rng = random.Random(seed)
+        # Universal hashing (a*x + b) mod p simulates random permutations
+        self.permutations = [(rng.randrange(1, MERSENNE_PRIME), rng.randrange(MERSENNE_PRIME))
+                             for _ in range(num_perm)]
+    
+    def signature(self, items):
+        """Compute a compact signature (array of unsigned 64-bit ints)"""
+        hashes = [stable_hash64(item) & MERSENNE_PRIME for item in set(items)]
+        if not hashes:
+            return array('Q', [MAX_HASH] * self.num_perm)
+        p = MERSENNE_PRIME
+        return array('Q', [min((a * x + b) % p for x in hashes)
+                           for a, b in self.permutations])
+    
+    @staticmethod
+    def estimate_jaccard(sig1, sig2):
+        """Estimate Jaccard similarity from two signatures"""
+        matches = sum(1 for h1, h2 in zip(sig1, sig2) if h1 == h2)
+        return matches / len(sig1)
+
+class MinHashLSH:
+    """Banded LSH index over MinHash signatures for near-duplicate search
+    
+    Signatures live in one flat array('Q') (8 bytes per permutation per set).
+    Buckets are compact too: per band, sorted runs of band hashes
+    (array('Q')) with parallel set ids (array('I')), searched with bisect
+    (12 bytes per set per band). Inserts collect in small pending arrays;
+    every PENDING_LIMIT inserts they become a new run, and runs of similar
+    size are merged like a binary counter, so there are O(log n) runs and
+    each entry is merged O(log n) times however inserts and queries mix.
+    Pass keep_sets=False to drop the original sets when memory is tight;
+    candidates are then scored with the signature estimate instead of the
+    exact jaccard_similarity.
+    """
+    
+    PENDING_LIMIT = 256
+    
+    def __init__(self, num_perm=128, bands=32, seed=1, keep_sets=True):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.minhash = MinHash(num_perm, seed)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.keep_sets = keep_sets
+        self.keys = []
+        self.sets = []
+        self.signatures = array('Q')
+        self.band_runs = [[] for _ in range(bands)]  # per band: [(hashes, ids)], largest first
+        self.pending_hashes = [array('Q') for _ in range(bands)]
+        self.pending_ids = [array('I') for _ in range(bands)]
+    
+    def _band_keys(self, sig):
+        """One 64-bit bucket key per band of rows (stable across processes)"""
+        rows = self.rows
+        return [stable_hash64(sig[band * rows:(band + 1) * rows].tobytes())
+                for band in range(self.bands)]
+    
+    @staticmethod
+    def _merge_runs(run1, run2):
+        """Merge two sorted (hashes, ids) runs into one"""
+        # Timsort spots the two sorted runs, so this is a linear merge in C
+        merged = sorted(itertools.chain(zip(*run1), zip(*run2)))
+        return (array('Q', map(operator.itemgetter(0), merged)),
+                array('I', map(operator.itemgetter(1), merged)))
+    
+    def _flush_pending(self, compact=False):
+        """Turn the pending entries into a run; with compact, leave one run per band"""
+        for band in range(self.bands):
+            runs = self.band_runs[band]
+            if self.pending_ids[band]:
+                pending = sorted(zip(self.pending_hashes[band], self.pending_ids[band]))
+                runs.append((array('Q', [band_key for band_key, _ in pending]),
+                             array('I', [index for _, index in pending])))
+                self.pending_hashes[band], self.pending_ids[band] = array('Q'), array('I')
+            while len(runs) > 1 and (compact or len(runs[-1][0]) * 2 >= len(runs[-2][0])):
+                newer = runs.pop()
+                runs[-1] = self._merge_runs(runs[-1], newer)
+    
+    def _bucket(self, band, band_key):
+        """Set ids whose band hashes to band_key"""
+        bucket = []
+        for hashes, ids in self.band_runs[band]:
+            low = bisect.bisect_left(hashes, band_key)
+            high = bisect.bisect_right(hashes, band_key, lo=low)
+            bucket.extend(ids[low:high])
+        bucket.extend(index for pending_key, index in zip(self.pending_hashes[band], self.pending_ids[band])
+                      if pending_key == band_key)
+        return bucket
+    
+    def _signature_of(self, index):
+        """Slice one stored signature out of the flat array"""
+        start = index * self.num_perm
+        return self.signatures[start:start + self.num_perm]
+    
+    def insert(self, key, items):
+        """Add one set to the index"""
+        items = set(items)
+        sig = self.minhash.signature(items)
+        index = len(self.keys)
+        self.keys.append(key)
+        if self.keep_sets:
+            self.sets.append(items)
+        self.signatures.extend(sig)
+        for band, band_key in enumerate(self._band_keys(sig)):
+            self.pending_hashes[band].append(band_key)
+            self.pending_ids[band].append(index)
+        if len(self.pending_ids[0]) >= self.PENDING_LIMIT:
+            self._flush_pending()
+    
+    def bulk_build(self, keyed_sets):
+        """Insert many (key, items) pairs"""
+        for key, items in keyed_sets:
+            self.insert(key, items)
+        self._flush_pending(compact=True)
+        return self
+    
+    def _score(self, index, items, sig):
+        """Exact Jaccard when sets are kept, signature estimate otherwise"""
+        if self.keep_sets:
+            return jaccard_similarity(items, self.sets[index])
+        return MinHash.estimate_jaccard(sig, self._signature_of(index))
+    
+    def query(self, items, threshold=0.5):
+        """Find indexed sets similar to items: [(key, jaccard), ...], best first"""
+        items = set(items)
+        sig = self.minhash.signature(items)
+        candidates = set()
+        for band, band_key in enumerate(self._band_keys(sig)):
+            candidates.update(self._bucket(band, band_key))
+        results = []
+        for index in candidates:
+            score = self._score(index, items, sig)
+            if score >= threshold:
+                results.append((self.keys[index], score))
+        return sorted(results, key=lambda r: -r[1])
+    
+    def near_duplicate_pairs(self, threshold=0.5):
+        """All verified pairs sharing at least one bucket: [(key1, key2, jaccard)]"""
+        self._flush_pending(compact=True)
+        candidate_pairs = set()
+        for runs in self.band_runs:  # Compacted: at most one run per band
+            for hashes, ids in runs:
+                for _, run in itertools.groupby(zip(hashes, ids), key=operator.itemgetter(0)):
+                    indexes = [index for _, index in run]
+                    if len(indexes) > 1:
+                        candidate_pairs.update(itertools.combinations(indexes, 2))
+        results = []
+        for i, j in sorted(candidate_pairs):
+            if self.keep_sets:
+                score = jaccard_similarity(self.sets[i], self.sets[j])
+            else:
+                score = MinHash.estimate_jaccard(self._signature_of(i), self._signature_of(j))
+            if score >= threshold:
+                results.append((self.keys[i], self.keys[j], score))
+        return results
+
+print(f"\n🔎 MinHash LSH (approximate Jaccard search):")
+documents = {
+    "doc1": set("the quick brown fox jumps over the lazy dog".split()),
+    "doc2": set("the quick brown fox jumped over the lazy dog".split()),
+    "doc3": set("python sets make membership tests fast".split()),
+    "doc4": set("python sets make membership tests very fast".split()),
+    "doc5": set("completely unrelated words here".split()),
+}
+lsh = MinHashLSH(num_perm=64, bands=16).bulk_build(documents.items())
+sig1 = lsh.minhash.signature(documents["doc1"])
+sig2 = lsh.minhash.signature(documents["doc2"])
+print(f"Exact Jaccard(doc1, doc2): {jaccard_similarity(documents['doc1'], documents['doc2']):.3f}")
+print(f"MinHash estimate:          {MinHash.estimate_jaccard(sig1, sig2):.3f}")
+print(f"Signature size: {sig1.itemsize * len(sig1)} bytes per set")
+print(f"Query like doc3: {lsh.query(documents['doc3'], threshold=0.5)}")
+print(f"Near-duplicate pairs: {lsh.near_duplicate_pairs(threshold=0.5)}")
+
 # Power set generation
 def power_set(s):
     """Generate power set (all possible subsets)"""
@@ -658,6 +946,102 @@ print(f"Power set ({len(power)} subsets):")
 for i, subset in enumerate(sorted(power, key=len)):
     print(f"  {i+1:2}: {subset}")
 
+# Lazy power set: one subset at a time instead of a 2^n list
+def gray_code_subsets(items, start=0, stop=None):
+    """Yield subsets number start..stop-1 in Gray-code order
+    
+    Consecutive Gray codes differ in one bit, so each step adds or removes
+    exactly one element. The same set object is updated in place and
+    yielded each time; copy it if you keep it.
+    """
+    items = list(items)
+    stop = 2 ** len(items) if stop is None else stop
+    if start >= stop:
+        return
+    gray = start ^ (start >> 1)
+    subset = {item for bit, item in enumerate(items) if gray >> bit & 1}
+    yield subset
+    for index in range(start + 1, stop):
+        # Gray codes of index-1 and index differ in the lowest set bit of index
+        item = items[(index & -index).bit_length() - 1]
+        if item in subset:
+            subset.remove(item)
+        else:
+            subset.add(item)
+        yield subset
+
+def lazy_power_set(s, k=None):
+    """Generate subsets lazily: all of them in Gray-code order, or only size k"""
+    if k is not None:
+        return (set(combination) for combination in itertools.combinations(s, k))
+    return (set(subset) for subset in gray_code_subsets(s))
+
+def pruned_power_set(s, keep):
+    """Subsets passing keep, skipping every superset of a failing subset
+    
+    keep must be monotone: if a subset fails, all its supersets fail too
+    (for example "sum <= limit" on non-negative numbers).
+    """
+    items = list(s)
+    
+    def extend(subset, next_index):
+        yield set(subset)
+        for index in range(next_index, len(items)):
+            subset.append(items[index])
+            if keep(subset):
+                yield from extend(subset, index + 1)
+            subset.pop()
+    
+    if keep([]):
+        yield from extend([], 0)
+
+def subsets_with_sum_at_most(numbers, limit):
+    """Subsets of non-negative numbers whose sum is <= limit"""
+    numbers = sorted(numbers)
+    
+    def extend(subset, total, next_index):
+        yield list(subset)
+        for index in range(next_index, len(numbers)):
+            if total + numbers[index] > limit:
+                break  # Numbers are sorted, so every later choice is too big as well
+            subset.append(numbers[index])
+            yield from extend(subset, total + numbers[index], index + 1)
+            subset.pop()
+    
+    if limit >= 0:
+        yield from extend([], 0, 0)
+
+def _search_subset_range(job):
+    """Worker: subsets in one Gray-code index range that satisfy predicate"""
+    items, start, stop, predicate = job
+    return [set(subset) for subset in gray_code_subsets(items, start, stop) if predicate(subset)]
+
+def parallel_subset_search(s, predicate, processes=2, chunks=None):
+    """Split the 2^n subset indexes into ranges and search them in a pool
+    
+    predicate must be a module-level function so it can be pickled.
+    """
+    items = list(s)
+    total = 2 ** len(items)
+    chunks = chunks or processes * 4
+    step = -(-total // chunks)
+    jobs = [(items, start, min(start + step, total), predicate) for start in range(0, total, step)]
+    matches = []
+    with multiprocessing.Pool(processes) as pool:
+        for chunk_matches in pool.imap(_search_subset_range, jobs):
+            matches.extend(chunk_matches)
+    return matches
+
+print(f"\n🐢 Lazy Power Sets:")
+gray_steps = [sorted(subset) for subset in lazy_power_set(['a', 'b', 'c'])]
+print(f"Gray-code order (one change per step): {gray_steps}")
+print(f"Size-2 subsets of {{1, 2, 3, 4}}: {list(lazy_power_set([1, 2, 3, 4], k=2))}")
+print(f"Subsets of [3, 5, 8, 13] with sum <= 13: {list(subsets_with_sum_at_most([3, 5, 8, 13], 13))}")
+at_most_two = list(pruned_power_set(range(5), lambda subset: len(subset) <= 2))
+print(f"Pruned (len <= 2) subsets of range(5): {len(at_most_two)}")
+first_large = next(subset for subset in lazy_power_set(range(40)) if len(subset) == 3)
+print(f"First 3-element subset of a 2^40 power set, found lazily: {first_large}")
+
 # Finding symmetric difference across multiple sets
 def multi_symmetric_difference(*sets):
     """Find symmetric difference across multiple sets"""
@@ -676,6 +1060,360 @@ print(f"Set 3: {set3}")
 multi_sym_diff = multi_symmetric_difference(set1, set2, set3)
 print(f"Multi-symmetric difference: {multi_sym_diff}")
 
+# External-memory set algebra for files too big for RAM
+def union_all(*lists):
+    """Elements in any list"""
+    return set().union(*lists)
+
+def difference_all(first, *others):
+    """Elements of the first list missing from all others"""
+    return set(first).difference(*others)
+
+SET_OPERATIONS = {
+    'intersection': find_common_elements,
+    'union': union_all,
+    'difference': difference_all,
+    'symmetric_difference': multi_symmetric_difference,
+    'unique': find_unique_elements,
+}
+
+def partition_file(path, partitions, spill_dir, tag):
+    """Hash-partition a one-ID-per-line file into spill files; returns their paths"""
+    spill_paths = [os.path.join(spill_dir, f"{tag}_{k}.txt") for k in range(partitions)]
+    spill_files = [open(spill_path, 'wb') for spill_path in spill_paths]
+    try:
+        with open(path, 'rb') as source:
+            for line in source:
+                item = line.rstrip(b'\r\n')
+                if item:
+                    # crc32 is stable across processes, unlike hash()
+                    spill_files[zlib.crc32(item) % partitions].write(item + b'\n')
+    finally:
+        for spill_file in spill_files:
+            spill_file.close()
+    return spill_paths
+
+def _read_spill(path):
+    """Load one spill file as a list of byte strings"""
+    with open(path, 'rb') as spill_file:
+        return spill_file.read().splitlines()
+
+def _solve_partition(job):
+    """Apply the set operation to one partition; optionally spill the result"""
+    operation, spill_paths, result_path = job
+    result = SET_OPERATIONS[operation](*(_read_spill(path) for path in spill_paths))
+    if result_path is None:
+        return result
+    with open(result_path, 'wb') as result_file:
+        result_file.writelines(item + b'\n' for item in result)
+    return result_path
+
+def stream_set_operation(operation, paths, partitions=64, processes=1, spill_dir=None):
+    """Yield the result of a set operation over ID files, one partition at a time
+    
+    Every input is split by hash into the same number of spill files, so a
+    given ID lands in the same partition everywhere; only one partition per
+    input has to fit in memory. With processes > 1 partitions are solved in
+    a multiprocessing pool.
+    """
+    if operation not in SET_OPERATIONS:
+        raise ValueError(f"Unknown operation: {operation}")
+    with tempfile.TemporaryDirectory(dir=spill_dir) as work_dir:
+        spills = [partition_file(path, partitions, work_dir, f"in{i}")
+                  for i, path in enumerate(paths)]
+        jobs = [(operation, [spill[k] for spill in spills],
+                 os.path.join(work_dir, f"out_{k}.txt") if processes > 1 else None)
+                for k in range(partitions)]
+        if processes == 1:
+            for job in jobs:
+                for item in _solve_partition(job):
+                    yield item.decode()
+            return
+        with multiprocessing.Pool(processes) as pool:
+            for result_path in pool.imap_unordered(_solve_partition, jobs):
+                for item in _read_spill(result_path):
+                    yield item.decode()
+
+def external_set_operation(operation, paths, output_path, **options):
+    """Run stream_set_operation and write the result to output_path; returns the count"""
+    count = 0
+    with open(output_path, 'w', encoding='utf-8') as output:
+        for item in stream_set_operation(operation, paths, **options):
+            output.write(item + '\n')
+            count += 1
+    return count
+
+print(f"\n💽 External-Memory Set Operations:")
+with tempfile.TemporaryDirectory() as demo_dir:
+    id_files = []
+    for name, ids in [("a", range(0, 6000)), ("b", range(3000, 9000, 2)), ("c", range(4000, 5000))]:
+        id_path = os.path.join(demo_dir, f"{name}.txt")
+        with open(id_path, 'w') as id_file:
+            id_file.writelines(f"{i}\n" for i in ids)
+        id_files.append(id_path)
+    in_memory = [set(map(str, ids)) for ids in (range(0, 6000), range(3000, 9000, 2), range(4000, 5000))]
+    for operation in SET_OPERATIONS:
+        streamed = set(stream_set_operation(operation, id_files, partitions=8))
+        expected = SET_OPERATIONS[operation](*in_memory)
+        print(f"  {operation:20}: {len(streamed):5} IDs, matches in-memory: {streamed == expected}")
+    written = external_set_operation('intersection', id_files, os.path.join(demo_dir, "common.txt"))
+    print(f"  Wrote {written} common IDs to common.txt")
+
+# Roaring bitmap: compressed sets of integer IDs
+class RoaringBitmap:
+    """Compressed set of non-negative ints (< 2^32) with set operators
+    
+    Values are split by their high 16 bits into chunks. Sparse chunks
+    (<= 4096 values) are sorted array('H') containers; dense chunks are a
+    65536-bit Python int used as a bitmap, so &, |, ^ and - run as C-level
+    bitwise operations. Supports |, &, -, ^, <=, ==, len, in and iteration,
+    so helpers like jaccard_similarity work on it unchanged.
+    """
+    
+    ARRAY_LIMIT = 4096
+    CHUNK = 1 << 16
+    MAX_VALUE = 1 << 32
+    OPERATORS = {'or': operator.or_, 'and': operator.and_, 'xor': operator.xor, 'sub': operator.sub}
+    
+    def __init__(self, values=()):
+        self.containers = {}  # high 16 bits -> array('H') or int bitmap
+        if values:
+            self.containers = RoaringBitmap.from_sorted(sorted(set(values))).containers
+    
+    # Container helpers
+    @classmethod
+    def _high_bits(cls, value):
+        """Chunk key of a value, rejecting values outside [0, 2^32)"""
+        if not 0 <= value < cls.MAX_VALUE:
+            raise ValueError(f"RoaringBitmap values must be in [0, 2**32), got {value}")
+        return value >> 16
+    
+    @staticmethod
+    def _array_to_bitmap(values):
+        bits = bytearray(RoaringBitmap.CHUNK // 8)
+        for value in values:
+            bits[value >> 3] |= 1 << (value & 7)
+        return int.from_bytes(bits, 'little')
+    
+    @staticmethod
+    def _bitmap_to_array(bitmap):
+        values = array('H')
+        for byte_index, byte in enumerate(bitmap.to_bytes(RoaringBitmap.CHUNK // 8, 'little')):
+            while byte:
+                low_bit = byte & -byte
+                values.append(byte_index * 8 + low_bit.bit_length() - 1)
+                byte ^= low_bit
+        return values
+    
+    @staticmethod
+    def _cardinality(container):
+        return container.bit_count() if isinstance(container, int) else len(container)
+    
+    @classmethod
+    def _normalize(cls, container):
+        """Pick the cheaper representation; None for an empty container"""
+        if isinstance(container, int):
+            count = container.bit_count()
+            if count == 0:
+                return None
+            return cls._bitmap_to_array(container) if count <= cls.ARRAY_LIMIT else container
+        if not container:
+            return None
+        return cls._array_to_bitmap(container) if len(container) > cls.ARRAY_LIMIT else container
+    
+    @classmethod
+    def _combine(cls, container1, container2, operation):
+        """Apply a set operation to two containers"""
+        if isinstance(container1, int) or isinstance(container2, int):
+            bits1 = container1 if isinstance(container1, int) else cls._array_to_bitmap(container1)
+            bits2 = container2 if isinstance(container2, int) else cls._array_to_bitmap(container2)
+            if operation == 'sub':
+                return cls._normalize(bits1 & ~bits2)
+            return cls._normalize(cls.OPERATORS[operation](bits1, bits2))
+        result = cls.OPERATORS[operation](set(container1), set(container2))
+        return cls._normalize(array('H', sorted(result)))
+    
+    # Construction
+    @classmethod
+    def from_sorted(cls, values):
+        """Bulk-build from sorted values (duplicates allowed)"""
+        bitmap = cls()
+        for high, group in itertools.groupby(values, key=cls._high_bits):
+            lows = array('H', (value & 0xFFFF for value in group))
+            if len(lows) > 1:
+                lows = array('H', sorted(set(lows)))
+            bitmap.containers[high] = cls._normalize(lows)
+        return bitmap
+    
+    @classmethod
+    def from_range(cls, start, stop):
+        """All ints in range(start, stop), built chunk by chunk"""
+        bitmap = cls()
+        if start < stop and (start < 0 or stop > cls.MAX_VALUE):
+            raise ValueError(f"RoaringBitmap values must be in [0, 2**32), got range({start}, {stop})")
+        value = start
+        while value < stop:
+            high = value >> 16
+            chunk_end = min(stop, (high + 1) << 16)
+            low_start, low_stop = value & 0xFFFF, chunk_end - (high << 16)
+            if low_stop - low_start > cls.ARRAY_LIMIT:
+                bitmap.containers[high] = ((1 << (low_stop - low_start)) - 1) << low_start
+            else:
+                bitmap.containers[high] = array('H', range(low_start, low_stop))
+            value = chunk_end
+        return bitmap
+    
+    # Single-value operations
+    def add(self, value):
+        high, low = self._high_bits(value), value & 0xFFFF
+        container = self.containers.get(high)
+        if container is None:
+            self.containers[high] = array('H', [low])
+        elif isinstance(container, int):
+            self.containers[high] = container | (1 << low)
+        else:
+            position = bisect.bisect_left(container, low)
+            if position == len(container) or container[position] != low:
+                container.insert(position, low)
+                self.containers[high] = self._normalize(container)
+    
+    def discard(self, value):
+        high, low = value >> 16, value & 0xFFFF
+        container = self.containers.get(high)
+        if container is None:
+            return
+        if isinstance(container, int):
+            container &= ~(1 << low)
+        else:
+            position = bisect.bisect_left(container, low)
+            if position < len(container) and container[position] == low:
+                del container[position]
+        container = self._normalize(container)
+        if container is None:
+            del self.containers[high]
+        else:
+            self.containers[high] = container
+    
+    def __contains__(self, value):
+        if not isinstance(value, int) or value < 0:
+            return False
+        container = self.containers.get(value >> 16)
+        if container is None:
+            return False
+        low = value & 0xFFFF
+        if isinstance(container, int):
+            return (container >> low) & 1 == 1
+        position = bisect.bisect_left(container, low)
+        return position < len(container) and container[position] == low
+    
+    def __len__(self):
+        return sum(self._cardinality(container) for container in self.containers.values())
+    
+    def __iter__(self):
+        for high in sorted(self.containers):
+            container = self.containers[high]
+            lows = self._bitmap_to_array(container) if isinstance(container, int) else container
+            base = high << 16
+            for low in lows:
+                yield base + low
+    
+    # Set algebra
+    def _apply(self, other, operation):
+        result = RoaringBitmap()
+        if operation == 'and':
+            highs = self.containers.keys() & other.containers.keys()
+        elif operation == 'sub':
+            highs = self.containers.keys()
+        else:
+            highs = self.containers.keys() | other.containers.keys()
+        for high in highs:
+            mine, theirs = self.containers.get(high), other.containers.get(high)
+            if theirs is None:
+                container = copy.copy(mine)
+            elif mine is None:
+                container = copy.copy(theirs)
+            else:
+                container = self._combine(mine, theirs, operation)
+            if container is not None:
+                result.containers[high] = container
+        return result
+    
+    def __or__(self, other):
+        return self._apply(other, 'or')
+    
+    def __and__(self, other):
+        return self._apply(other, 'and')
+    
+    def __sub__(self, other):
+        return self._apply(other, 'sub')
+    
+    def __xor__(self, other):
+        return self._apply(other, 'xor')
+    
+    def __le__(self, other):
+        return not (self - other).containers
+    
+    def __ge__(self, other):
+        return other <= self
+    
+    def __eq__(self, other):
+        if not isinstance(other, RoaringBitmap):
+            return NotImplemented
+        return not (self ^ other).containers
+    
+    __hash__ = None
+    
+    def __repr__(self):
+        return f"RoaringBitmap({len(self)} values in {len(self.containers)} containers)"
+    
+    # Serialization
+    def memory_bytes(self):
+        """Payload size of all containers"""
+        return sum(len(container) * 2 if isinstance(container, array) else self.CHUNK // 8
+                   for container in self.containers.values())
+    
+    def to_bytes(self):
+        """Layout: count, then per container (high, is_bitmap, length) + payload"""
+        parts = [struct.pack('<I', len(self.containers))]
+        for high in sorted(self.containers):
+            container = self.containers[high]
+            if isinstance(container, int):
+                payload = container.to_bytes(self.CHUNK // 8, 'little')
+                parts.append(struct.pack('<HBI', high, 1, len(payload)))
+            else:
+                payload = container.tobytes()
+                parts.append(struct.pack('<HBI', high, 0, len(payload)))
+            parts.append(payload)
+        return b''.join(parts)
+    
+    @classmethod
+    def from_bytes(cls, data):
+        bitmap = cls()
+        (count,), offset = struct.unpack_from('<I', data), 4
+        for _ in range(count):
+            high, is_bitmap, length = struct.unpack_from('<HBI', data, offset)
+            offset += struct.calcsize('<HBI')
+            payload = bytes(data[offset:offset + length])
+            offset += length
+            if is_bitmap:
+                bitmap.containers[high] = int.from_bytes(payload, 'little')
+            else:
+                bitmap.containers[high] = array('H', payload)
+        return bitmap
+
+print(f"\n🗜️ Roaring Bitmaps for Integer ID Sets:")
+post_ids = RoaringBitmap.from_range(0, 1_000_000) - RoaringBitmap.from_range(500_000, 510_000)
+sparse_ids = RoaringBitmap(range(0, 1_000_000, 997))
+print(f"Dense IDs: {post_ids}, {post_ids.memory_bytes():,} bytes "
+      f"(set would be ~{sys.getsizeof(set(range(990_000))):,} bytes + int objects)")
+print(f"Sparse IDs: {sparse_ids}, {sparse_ids.memory_bytes():,} bytes")
+print(f"Operators: |={len(post_ids | sparse_ids):,}, &={len(post_ids & sparse_ids):,}, "
+      f"-={len(sparse_ids - post_ids):,}, ^={len(post_ids ^ sparse_ids):,}")
+print(f"997 in sparse: {997 in sparse_ids}, 998 in sparse: {998 in sparse_ids}, "
+      f"subset: {(sparse_ids & post_ids) <= post_ids}")
+print(f"jaccard_similarity on bitmaps: {jaccard_similarity(post_ids, sparse_ids):.5f}")
+print(f"Serialized round trip equal: {RoaringBitmap.from_bytes(post_ids.to_bytes()) == post_ids}")
+
 print("\n" + "=" * 50)
 print("🔟 Real-World Applications")
 print("=" * 50)
@@ -691,14 +1429,24 @@ class BlogPost:
         self.title = title
         self.content = content
         self.tags = set(tags) if tags else set()
+        self.post_id = None  # Assigned by BlogSystem.add_post
+        self.blog = None     # Owning BlogSystem, kept in sync on tag changes
     
     def add_tag(self, tag):
         """Add a tag to the post"""
-        self.tags.add(tag.lower())
+        tag = tag.lower()
+        if tag not in self.tags:
+            self.tags.add(tag)
+            if self.blog is not None:
+                self.blog._index_tag(self, tag)
     
     def remove_tag(self, tag):
         """Remove a tag from the post"""
-        self.tags.discard(tag.lower())
+        tag = tag.lower()
+        if tag in self.tags:
+            self.tags.discard(tag)
+            if self.blog is not None:
+                self.blog._unindex_tag(self, tag)
     
     def has_tag(self, tag):
         """Check if post has a specific tag"""
@@ -715,44 +1463,143 @@ class BlogPost:
     def __str__(self):
         return f"'{self.title}' - Tags: {self.tags}"
 
+def intersect_sorted(list1, list2):
+    """Intersect two sorted lists, probing the longer one with binary search"""
+    if len(list1) > len(list2):
+        list1, list2 = list2, list1
+    result = []
+    lo = 0
+    for value in list1:
+        lo = bisect.bisect_left(list2, value, lo)
+        if lo == len(list2):
+            break
+        if list2[lo] == value:
+            result.append(value)
+            lo += 1
+    return result
+
 class BlogSystem:
     """Blog system with tag-based filtering"""
     
     def __init__(self):
         self.posts = []
+        self.tag_index = {}  # tag -> sorted list of post ids (posting list)
     
     def add_post(self, post):
         """Add a post to the system"""
+        post.post_id = len(self.posts)
+        post.blog = self
         self.posts.append(post)
+        for tag in post.tags:
+            # Ids only grow, so appending keeps every posting list sorted
+            self.tag_index.setdefault(tag, []).append(post.post_id)
+    
+    def _index_tag(self, post, tag):
+        """Add a post id to a tag's posting list"""
+        bisect.insort(self.tag_index.setdefault(tag, []), post.post_id)
+    
+    def _unindex_tag(self, post, tag):
+        """Remove a post id from a tag's posting list"""
+        posting = self.tag_index.get(tag)
+        if not posting:
+            return
+        pos = bisect.bisect_left(posting, post.post_id)
+        if pos < len(posting) and posting[pos] == post.post_id:
+            del posting[pos]
+        if not posting:
+            del self.tag_index[tag]
+    
+    def _posts_for_ids(self, post_ids):
+        """Map post ids back to post objects"""
+        return [self.posts[post_id] for post_id in post_ids]
     
     def get_all_tags(self):
         """Get all unique tags across all posts"""
-        all_tags = set()
-        for post in self.posts:
-            all_tags |= post.tags
-        return all_tags
+        return set(self.tag_index)
     
     def find_by_tag(self, tag):
         """Find posts with specific tag"""
-        return [post for post in self.posts if post.has_tag(tag)]
+        return self._posts_for_ids(self.tag_index.get(tag.lower(), []))
     
     def find_by_any_tags(self, tags):
-        """Find posts with any of the given tags"""
-        return [post for post in self.posts if post.has_any_tags(tags)]
+        """Find posts with any of the given tags (union of posting lists)"""
+        post_ids = set()
+        for tag in set(tag.lower() for tag in tags):
+            post_ids.update(self.tag_index.get(tag, ()))
+        return self._posts_for_ids(sorted(post_ids))
     
     def find_by_all_tags(self, tags):
-        """Find posts with all of the given tags"""
-        return [post for post in self.posts if post.has_all_tags(tags)]
+        """Find posts with all of the given tags (intersection of posting lists)"""
+        tags = set(tag.lower() for tag in tags)
+        if not tags:
+            return list(self.posts)
+        postings = [self.tag_index.get(tag, []) for tag in tags]
+        postings.sort(key=len)  # Start from the rarest tag
+        post_ids = postings[0]
+        for posting in postings[1:]:
+            if not post_ids:
+                break
+            post_ids = intersect_sorted(post_ids, posting)
+        return self._posts_for_ids(post_ids)
+    
+    def _tag_overlaps(self, post, idf=False):
+        """Count shared tags per post by walking only the post's posting lists"""
+        overlaps = Counter()
+        weights = defaultdict(float)
+        total_posts = len(self.posts)
+        for tag in post.tags:
+            posting = self.tag_index.get(tag, ())
+            # Smoothed IDF: rare tags say more about relatedness than common ones
+            weight = math.log((1 + total_posts) / (1 + len(posting))) + 1
+            for post_id in posting:
+                overlaps[post_id] += 1
+                if idf:
+                    weights[post_id] += weight
+        if post.blog is self:
+            overlaps.pop(post.post_id, None)
+            weights.pop(post.post_id, None)
+        return overlaps, weights
     
     def get_related_posts(self, post, min_common_tags=1):
         """Find posts related to given post based on common tags"""
+        overlaps, _ = self._tag_overlaps(post)
         related = []
-        for other_post in self.posts:
-            if other_post != post:
-                common_tags = post.tags & other_post.tags
-                if len(common_tags) >= min_common_tags:
-                    related.append((other_post, common_tags))
+        for post_id in sorted(overlaps):
+            if overlaps[post_id] >= min_common_tags:
+                other_post = self.posts[post_id]
+                related.append((other_post, post.tags & other_post.tags))
         return related
+    
+    def top_related_posts(self, post, k=5, scoring="overlap", min_common_tags=1):
+        """Return the k most related posts as (post, score), best first
+        
+        scoring: "overlap" (shared tag count), "jaccard" or "idf" (shared
+        tags weighted by rarity).
+        """
+        if scoring not in ("overlap", "jaccard", "idf"):
+            raise ValueError(f"Unknown scoring: {scoring}")
+        overlaps, weights = self._tag_overlaps(post, idf=scoring == "idf")
+        candidates = []
+        for post_id, count in overlaps.items():
+            if count < min_common_tags:
+                continue
+            if scoring == "jaccard":
+                score = jaccard_similarity(post.tags, self.posts[post_id].tags)
+            elif scoring == "idf":
+                score = weights[post_id]
+            else:
+                score = count
+            candidates.append((score, post_id))
+        # Heap selection: O(candidates · log k) instead of a full sort
+        best = heapq.nlargest(k, candidates, key=lambda c: (c[0], -c[1]))
+        return [(self.posts[post_id], score) for score, post_id in best]
+    
+    def build_related_index(self, k=5, scoring="overlap", min_common_tags=1):
+        """Precompute related posts for every post: {post_id: [(post, score), ...]}"""
+        return {
+            post.post_id: self.top_related_posts(post, k, scoring, min_common_tags)
+            for post in self.posts
+        }
 
 print("📝 Blog Tag System:")
 blog = BlogSystem()
@@ -786,64 +1633,270 @@ print(f"\nPosts with 'advanced' OR 'web' tags:")
 for post in advanced_posts:
     print(f"  {post}")
 
+python_programming = blog.find_by_all_tags(["python", "programming"])
+print(f"\nPosts with 'python' AND 'programming' tags:")
+for post in python_programming:
+    print(f"  {post}")
+
 # Find related posts
 related = blog.get_related_posts(post1)
 print(f"\nPosts related to '{post1.title}':")
 for related_post, common_tags in related:
     print(f"  {related_post.title} (common: {common_tags})")
 
+print(f"\nTop related posts for '{post3.title}':")
+for scoring in ("overlap", "jaccard", "idf"):
+    top = blog.top_related_posts(post3, k=2, scoring=scoring)
+    print(f"  {scoring:8}: {[(p.title, round(score, 3)) for p, score in top]}")
+
+related_index = blog.build_related_index(k=1)
+print("Best match per post (batch):")
+for post_id, top in related_index.items():
+    print(f"  {blog.posts[post_id].title} → {[p.title for p, _ in top]}")
+
+# Tag changes on a post keep the inverted index up to date
+post4.add_tag("beginner")
+post1.remove_tag("beginner")
+print(f"\nTag index after retagging: 'beginner' → {[p.title for p in blog.find_by_tag('beginner')]}")
+
 # User access control system
 print(f"\n🔐 User Access Control System:")
 class UserAccessControl:
-    """User access control using sets for permissions"""
+    """User access control using sets for permissions
+    
+    Each user's effective permissions are materialized when roles change,
+    together with a permission -> users reverse index, so checks are O(1).
+    """
     
     def __init__(self):
         self.users = {}
+        self.user_order = {}                       # user -> creation position
         self.roles = {}
         self.user_roles = {}
+        self.role_users = defaultdict(set)         # role -> users holding it
+        self.user_permissions = {}                 # user -> materialized permissions
+        self.permission_users = defaultdict(set)   # permission -> users (reverse index)
+    
+    def _refresh_user(self, username):
+        """Recompute one user's permissions and patch the reverse index with the diff"""
+        old_permissions = self.user_permissions.get(username, set())
+        new_permissions = set()
+        for role in self.user_roles[username]:
+            if role in self.roles:
+                new_permissions |= self.roles[role]
+        for permission in old_permissions - new_permissions:
+            self.permission_users[permission].discard(username)
+            if not self.permission_users[permission]:
+                del self.permission_users[permission]
+        for permission in new_permissions - old_permissions:
+            self.permission_users[permission].add(username)
+        self.user_permissions[username] = new_permissions
     
     def create_role(self, role_name, permissions):
         """Create a role with specific permissions"""
         self.roles[role_name] = set(permissions)
+        # Redefining a role only touches the users that hold it
+        for username in self.role_users.get(role_name, ()):
+            self._refresh_user(username)
     
     def create_user(self, username):
-        """Create a new user"""
+        """Create a new user (re-creating one drops their roles)"""
+        for role in self.user_roles.get(username, ()):
+            self.role_users[role].discard(username)
         self.users[username] = True
+        self.user_order.setdefault(username, len(self.user_order))
         self.user_roles[username] = set()
+        self._refresh_user(username)
     
     def assign_role(self, username, role_name):
         """Assign a role to a user"""
         if username in self.users and role_name in self.roles:
-            self.user_roles[username].add(role_name)
+            if role_name not in self.user_roles[username]:
+                self.user_roles[username].add(role_name)
+                self.role_users[role_name].add(username)
+                self._refresh_user(username)
     
     def revoke_role(self, username, role_name):
         """Revoke a role from a user"""
-        if username in self.user_roles:
+        if username in self.user_roles and role_name in self.user_roles[username]:
             self.user_roles[username].discard(role_name)
+            self.role_users[role_name].discard(username)
+            self._refresh_user(username)
     
     def get_user_permissions(self, username):
         """Get all permissions for a user"""
-        if username not in self.user_roles:
-            return set()
-        
-        permissions = set()
-        for role in self.user_roles[username]:
-            if role in self.roles:
-                permissions |= self.roles[role]
-        return permissions
+        return set(self.user_permissions.get(username, ()))
     
     def user_can(self, username, permission):
         """Check if user has a specific permission"""
-        user_permissions = self.get_user_permissions(username)
-        return permission in user_permissions
+        return permission in self.user_permissions.get(username, ())
     
     def users_with_permission(self, permission):
-        """Find all users with a specific permission"""
-        users = []
-        for username in self.users:
-            if self.user_can(username, permission):
-                users.append(username)
-        return users
+        """Find all users with a specific permission, in creation order"""
+        return sorted(self.permission_users.get(permission, ()), key=self.user_order.__getitem__)
+
+class BitmaskAccessControl:
+    """Compact access control: permissions and roles interned to bit positions
+    
+    Same API as UserAccessControl, without any per-user sets. Roles are
+    Python int permission masks; each user is a row in two array('Q')
+    matrices, one of effective permissions and one of role membership (one
+    64-bit word per 64 permissions or roles). Unions are bitwise OR and
+    checks are a single AND, like set_bit/check_bit in _7_numbers.py.
+    """
+    
+    WORD_MASK = (1 << 64) - 1
+    
+    def __init__(self):
+        self.permission_bits = {}   # permission -> bit position
+        self.permission_names = []  # bit position -> permission
+        self.role_bits = {}         # role -> bit position
+        self.role_masks = []        # role bit -> permission bitmask
+        self.user_rows = {}         # username -> row in both matrices
+        self.usernames = []         # row -> username
+        self.words = 1              # 64-bit permission words per user row
+        self.user_masks = array('Q')
+        self.role_words = 1         # 64-bit role words per user row
+        self.user_role_masks = array('Q')
+    
+    # Bit-matrix helpers
+    @staticmethod
+    def _widen(matrix, words, new_words, rows):
+        """Re-layout a matrix with more words per row"""
+        widened = array('Q', bytes(8 * new_words * rows))
+        for row in range(rows):
+            widened[row * new_words:row * new_words + words] = matrix[row * words:(row + 1) * words]
+        return widened
+    
+    @staticmethod
+    def _read_row(matrix, words, row):
+        """Read a row as one Python int"""
+        mask = 0
+        for i, word in enumerate(matrix[row * words:(row + 1) * words]):
+            mask |= word << (64 * i)
+        return mask
+    
+    @classmethod
+    def _write_row(cls, matrix, words, row, mask):
+        start = row * words
+        for i in range(words):
+            matrix[start + i] = (mask >> (64 * i)) & cls.WORD_MASK
+    
+    @staticmethod
+    def _rows_with_bit(matrix, words, bit):
+        """Rows whose bit is set (strided slice = one word per row)"""
+        column = matrix[bit // 64::words]
+        word_mask = 1 << (bit % 64)
+        return itertools.compress(range(len(column)), map(word_mask.__and__, column))
+    
+    def _intern_permission(self, permission):
+        """Map a permission name to a bit, widening the matrix when needed"""
+        if permission not in self.permission_bits:
+            bit = len(self.permission_names)
+            self.permission_bits[permission] = bit
+            self.permission_names.append(permission)
+            if bit >= self.words * 64:
+                self.user_masks = self._widen(self.user_masks, self.words, self.words + 1, len(self.usernames))
+                self.words += 1
+        return self.permission_bits[permission]
+    
+    def _intern_role(self, role_name):
+        """Map a role name to a bit, widening the membership matrix when needed"""
+        if role_name not in self.role_bits:
+            bit = len(self.role_masks)
+            self.role_bits[role_name] = bit
+            self.role_masks.append(0)
+            if bit >= self.role_words * 64:
+                self.user_role_masks = self._widen(self.user_role_masks, self.role_words,
+                                                   self.role_words + 1, len(self.usernames))
+                self.role_words += 1
+        return self.role_bits[role_name]
+    
+    def _user_mask(self, username):
+        """A user's effective permissions as one Python int"""
+        row = self.user_rows.get(username)
+        return 0 if row is None else self._read_row(self.user_masks, self.words, row)
+    
+    def _mask_to_names(self, mask):
+        """Decode a bitmask back into permission names"""
+        names = set()
+        while mask:
+            low_bit = mask & -mask
+            names.add(self.permission_names[low_bit.bit_length() - 1])
+            mask ^= low_bit
+        return names
+    
+    def _refresh_user(self, row):
+        """OR the user's role masks together and store them in the matrix"""
+        roles = self._read_row(self.user_role_masks, self.role_words, row)
+        mask = 0
+        while roles:
+            low_bit = roles & -roles
+            mask |= self.role_masks[low_bit.bit_length() - 1]
+            roles ^= low_bit
+        self._write_row(self.user_masks, self.words, row, mask)
+    
+    def _set_role_bit(self, username, role_name, value):
+        row, bit = self.user_rows[username], self.role_bits[role_name]
+        index = row * self.role_words + bit // 64
+        if value:
+            self.user_role_masks[index] |= 1 << (bit % 64)
+        else:
+            self.user_role_masks[index] &= ~(1 << (bit % 64)) & self.WORD_MASK
+        self._refresh_user(row)
+    
+    def create_role(self, role_name, permissions):
+        """Create a role with specific permissions"""
+        mask = 0
+        for permission in permissions:
+            mask |= 1 << self._intern_permission(permission)
+        bit = self._intern_role(role_name)
+        self.role_masks[bit] = mask
+        # Redefining a role only touches the users that hold it
+        for row in list(self._rows_with_bit(self.user_role_masks, self.role_words, bit)):
+            self._refresh_user(row)
+    
+    def create_user(self, username):
+        """Create a new user (re-creating one zeroes their rows)"""
+        row = self.user_rows.get(username)
+        if row is None:
+            self.user_rows[username] = len(self.usernames)
+            self.usernames.append(username)
+            self.user_masks.extend([0] * self.words)
+            self.user_role_masks.extend([0] * self.role_words)
+        else:
+            self._write_row(self.user_role_masks, self.role_words, row, 0)
+            self._write_row(self.user_masks, self.words, row, 0)
+    
+    def assign_role(self, username, role_name):
+        """Assign a role to a user"""
+        if username in self.user_rows and role_name in self.role_bits:
+            self._set_role_bit(username, role_name, True)
+    
+    def revoke_role(self, username, role_name):
+        """Revoke a role from a user"""
+        if username in self.user_rows and role_name in self.role_bits:
+            self._set_role_bit(username, role_name, False)
+    
+    def get_user_permissions(self, username):
+        """Get all permissions for a user"""
+        return self._mask_to_names(self._user_mask(username))
+    
+    def user_can(self, username, permission):
+        """Check if user has a specific permission"""
+        bit = self.permission_bits.get(permission)
+        row = self.user_rows.get(username)
+        if bit is None or row is None:
+            return False
+        word = self.user_masks[row * self.words + bit // 64]
+        return (word >> (bit % 64)) & 1 == 1
+    
+    def users_with_permission(self, permission):
+        """Find all users with a specific permission (column scan of the matrix)"""
+        bit = self.permission_bits.get(permission)
+        if bit is None:
+            return []
+        return [self.usernames[row] for row in self._rows_with_bit(self.user_masks, self.words, bit)]
 
 # Set up access control system
 access_control = UserAccessControl()
@@ -874,73 +1927,110 @@ for user in users:
 print(f"\nUsers who can 'write': {access_control.users_with_permission('write')}")
 print(f"Users who can 'delete': {access_control.users_with_permission('delete')}")
 
+# Role changes update the cached permissions incrementally
+access_control.create_role("viewer", ["read", "comment"])
+access_control.revoke_role("bob", "editor")
+print(f"After redefining 'viewer' and revoking bob's 'editor' role:")
+print(f"  bob: {access_control.get_user_permissions('bob')}")
+print(f"  Users who can 'comment': {access_control.users_with_permission('comment')}")
+print(f"  Can bob 'write'? {access_control.user_can('bob', 'write')}")
+
+# Same API, bitmask storage
+compact_control = BitmaskAccessControl()
+compact_control.create_role("admin", ["read", "write", "delete", "manage_users"])
+compact_control.create_role("viewer", ["read"])
+for user in users:
+    compact_control.create_user(user)
+compact_control.assign_role("alice", "admin")
+compact_control.assign_role("charlie", "viewer")
+print(f"\nBitmask mode:")
+print(f"  Permission bits: {compact_control.permission_bits}")
+print(f"  alice mask: {bin(compact_control._user_mask('alice'))} → {compact_control.get_user_permissions('alice')}")
+print(f"  Users who can 'read': {compact_control.users_with_permission('read')}")
+print(f"  Storage: {(compact_control.words + compact_control.role_words) * 8} bytes per user (permissions + roles)")
+
 # Inventory tracking system
 print(f"\n📦 Inventory Tracking System:")
 class InventoryTracker:
-    """Track inventory using sets for categories and tags"""
+    """Track inventory using sets for categories and tags
+    
+    Category -> item ids and supplier -> item ids indexes are maintained on
+    every change, so lookups never scan the whole inventory. Results come
+    back in the order items were first added.
+    """
     
     def __init__(self):
         self.items = {}
-        self.categories = {}
-        self.suppliers = {}
+        self.item_order = {}                # item id -> position in self.items
+        self.categories = defaultdict(set)  # category -> item ids
+        self.suppliers = defaultdict(set)   # supplier -> item ids
+    
+    def _unindex(self, index, item_id, keys):
+        """Drop an item id from the given index entries"""
+        for key in keys:
+            index[key].discard(item_id)
+            if not index[key]:
+                del index[key]
     
     def add_item(self, item_id, name, categories=None, suppliers=None):
         """Add an item to inventory"""
+        if item_id in self.items:
+            old_item = self.items[item_id]
+            self._unindex(self.categories, item_id, old_item['categories'])
+            self._unindex(self.suppliers, item_id, old_item['suppliers'])
+        self.item_order.setdefault(item_id, len(self.item_order))
         self.items[item_id] = {
             'name': name,
             'categories': set(categories) if categories else set(),
             'suppliers': set(suppliers) if suppliers else set()
         }
+        for category in self.items[item_id]['categories']:
+            self.categories[category].add(item_id)
+        for supplier in self.items[item_id]['suppliers']:
+            self.suppliers[supplier].add(item_id)
     
     def add_category(self, item_id, category):
         """Add category to an item"""
         if item_id in self.items:
             self.items[item_id]['categories'].add(category)
+            self.categories[category].add(item_id)
     
     def add_supplier(self, item_id, supplier):
         """Add supplier to an item"""
         if item_id in self.items:
             self.items[item_id]['suppliers'].add(supplier)
+            self.suppliers[supplier].add(item_id)
+    
+    def _in_item_order(self, item_ids):
+        """Sort indexed item ids back into inventory order"""
+        return sorted(item_ids, key=self.item_order.__getitem__)
     
     def find_items_by_category(self, category):
         """Find all items in a specific category"""
-        return [item_id for item_id, item in self.items.items() 
-                if category in item['categories']]
+        return self._in_item_order(self.categories.get(category, ()))
     
     def find_items_by_supplier(self, supplier):
         """Find all items from a specific supplier"""
-        return [item_id for item_id, item in self.items.items() 
-                if supplier in item['suppliers']]
+        return self._in_item_order(self.suppliers.get(supplier, ()))
     
     def find_items_multiple_categories(self, categories, match_all=True):
         """Find items matching multiple categories"""
-        category_set = set(categories)
-        results = []
-        
-        for item_id, item in self.items.items():
-            item_categories = item['categories']
-            if match_all:
-                if category_set <= item_categories:  # All categories must match
-                    results.append(item_id)
-            else:
-                if category_set & item_categories:  # Any category matches
-                    results.append(item_id)
-        
-        return results
+        item_sets = [self.categories.get(category, set()) for category in set(categories)]
+        if not item_sets:
+            return list(self.items) if match_all else []
+        if match_all:
+            # Intersect starting from the smallest category
+            item_sets.sort(key=len)
+            return self._in_item_order(item_sets[0].intersection(*item_sets[1:]))
+        return self._in_item_order(set().union(*item_sets))
     
     def get_all_categories(self):
         """Get all unique categories"""
-        all_categories = set()
-        for item in self.items.values():
-            all_categories |= item['categories']
-        return all_categories
+        return set(self.categories)
     
     def get_all_suppliers(self):
         """Get all unique suppliers"""
-        all_suppliers = set()
-        for item in self.items.values():
-            all_suppliers |= item['suppliers']
-        return all_suppliers
+        return set(self.suppliers)
 
 # Set up inventory system
 inventory = InventoryTracker()
@@ -1144,6 +2234,249 @@ print(f"Singleton words: {analysis['singleton_words']}")
 print(f"Starting letters: {analysis['starting_letters']}")
 print(f"Unique characters: {analysis['unique_chars']}")
 
+# Streaming mode: fixed-size sketches instead of full sets and Counters
+class HyperLogLog:
+    """Distinct-count estimate in 2^precision bytes (standard error 1.04/sqrt(m))"""
+    
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.num_registers = 1 << precision
+        self.registers = bytearray(self.num_registers)
+    
+    def add(self, item):
+        h = stable_hash64(item)
+        index = h >> (64 - self.precision)
+        rest = h & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1  # Leading zeros + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+    
+    def count(self):
+        m = self.num_registers
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # Linear counting for small cardinalities
+        return round(estimate)
+    
+    def relative_error(self):
+        return 1.04 / math.sqrt(self.num_registers)
+    
+    def merge(self, other):
+        """Combine with a sketch of another shard (same precision)"""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLogs with different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+class CountMinSketch:
+    """Frequency estimates that never undercount; overcount <= epsilon*N with prob 1-delta"""
+    
+    def __init__(self, epsilon=0.001, delta=0.01):
+        self.epsilon = epsilon
+        self.delta = delta
+        self.width = math.ceil(math.e / epsilon)
+        self.depth = math.ceil(math.log(1 / delta))
+        self.table = array('Q', bytes(8 * self.width * self.depth))
+        self.total = 0
+    
+    def _slots(self, item):
+        h = stable_hash64(item)
+        h1, h2 = h & 0xFFFFFFFF, h >> 32
+        return [row * self.width + (h1 + row * h2) % self.width for row in range(self.depth)]
+    
+    def add(self, item, count=1):
+        for slot in self._slots(item):
+            self.table[slot] += count
+        self.total += count
+    
+    def estimate(self, item):
+        return min(self.table[slot] for slot in self._slots(item))
+    
+    def error_bound(self):
+        """Maximum overcount (with probability 1 - delta)"""
+        return self.epsilon * self.total
+    
+    def merge(self, other):
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Cannot merge CountMinSketches of different shapes")
+        self.table = array('Q', map(operator.add, self.table, other.table))
+        self.total += other.total
+        return self
+
+class SpaceSaving:
+    """Top-k heavy hitters with k counters; each count overestimates by <= N/k
+    
+    Items are grouped in stream-summary buckets (count -> items in arrival
+    order) with a heap of bucket counts, so finding the eviction victim does
+    not scan all k counters.
+    """
+    
+    def __init__(self, k=100):
+        self.k = k
+        self.counts = {}  # item -> count
+        self.errors = {}  # item -> possible overcount
+        self.total = 0
+        self.buckets = {}       # count -> OrderedDict of items with that count
+        self.bucket_heap = []   # bucket counts, stale entries skipped lazily
+    
+    def _place(self, item, count):
+        bucket = self.buckets.get(count)
+        if bucket is None:
+            bucket = self.buckets[count] = OrderedDict()
+            heapq.heappush(self.bucket_heap, count)
+            if len(self.bucket_heap) > 2 * len(self.buckets):
+                # Drop stale counts so the heap stays proportional to the live buckets
+                self.bucket_heap = list(self.buckets)
+                heapq.heapify(self.bucket_heap)
+        bucket[item] = None
+    
+    def _unplace(self, item, count):
+        bucket = self.buckets[count]
+        del bucket[item]
+        if not bucket:
+            del self.buckets[count]
+    
+    def _min_count(self):
+        heap = self.bucket_heap
+        while heap[0] not in self.buckets:
+            heapq.heappop(heap)
+        return heap[0]
+    
+    def _rebuild_buckets(self):
+        self.buckets, self.bucket_heap = {}, []
+        for item, count in self.counts.items():
+            self._place(item, count)
+    
+    def add(self, item, count=1):
+        self.total += count
+        if item in self.counts:
+            old_count = self.counts[item]
+            self._unplace(item, old_count)
+            self.counts[item] = old_count + count
+            self._place(item, old_count + count)
+        elif len(self.counts) < self.k:
+            self.counts[item] = count
+            self.errors[item] = 0
+            self._place(item, count)
+        else:
+            # Replace the smallest counter; the newcomer inherits its count as error
+            floor = self._min_count()
+            victim, _ = self.buckets[floor].popitem(last=False)
+            if not self.buckets[floor]:
+                del self.buckets[floor]
+            del self.counts[victim]
+            del self.errors[victim]
+            self.counts[item] = floor + count
+            self.errors[item] = floor
+            self._place(item, floor + count)
+    
+    def top(self, n=10):
+        """[(item, count, max_error)], largest first"""
+        best = heapq.nlargest(n, self.counts.items(), key=operator.itemgetter(1))
+        return [(item, count, self.errors[item]) for item, count in best]
+    
+    def merge(self, other):
+        """Mergeable summaries: items missing from a full summary get its minimum"""
+        floor1 = min(self.counts.values()) if len(self.counts) >= self.k else 0
+        floor2 = min(other.counts.values()) if len(other.counts) >= other.k else 0
+        merged = {}
+        for item in self.counts.keys() | other.counts.keys():
+            count = self.counts.get(item, floor1) + other.counts.get(item, floor2)
+            error = self.errors.get(item, floor1) + other.errors.get(item, floor2)
+            merged[item] = (count, error)
+        kept = heapq.nlargest(self.k, merged.items(), key=lambda entry: entry[1][0])
+        self.counts = {item: count for item, (count, _) in kept}
+        self.errors = {item: error for item, (_, error) in kept}
+        self._rebuild_buckets()
+        self.total += other.total
+        return self
+
+class TextSketch:
+    """Mergeable streaming summary of a text shard"""
+    
+    def __init__(self, precision=14, top_k=100, epsilon=0.001, delta=0.01):
+        self.distinct_words = HyperLogLog(precision)
+        self.frequencies = CountMinSketch(epsilon, delta)
+        self.heavy_hitters = SpaceSaving(top_k)
+        self.unique_chars = set()      # Bounded by the alphabet, so kept exactly
+        self.starting_letters = set()
+        self.total_words = 0
+    
+    def add_text(self, text):
+        text = text.lower()
+        self.unique_chars.update(text)
+        for word in text.split():
+            self.distinct_words.add(word)
+            self.frequencies.add(word)
+            self.heavy_hitters.add(word)
+            self.starting_letters.add(word[0])
+            self.total_words += 1
+    
+    def merge(self, other):
+        self.distinct_words.merge(other.distinct_words)
+        self.frequencies.merge(other.frequencies)
+        self.heavy_hitters.merge(other.heavy_hitters)
+        self.unique_chars |= other.unique_chars
+        self.starting_letters |= other.starting_letters
+        self.total_words += other.total_words
+        return self
+    
+    def report(self, top_n=10):
+        """Estimates together with their error bounds"""
+        distinct = self.distinct_words.count()
+        hitters = []
+        for word, count, error in self.heavy_hitters.top(top_n):
+            # Both sketches only overcount, so the smaller estimate is tighter
+            hitters.append((word, min(count, self.frequencies.estimate(word)), error))
+        return {
+            'total_words': self.total_words,
+            'unique_word_count': distinct,
+            'unique_word_error': f"±{self.distinct_words.relative_error():.1%} (1 std)",
+            'heavy_hitters': hitters,
+            'count_error_bound': f"≤ {self.frequencies.error_bound():.1f} "
+                                 f"(prob {1 - self.frequencies.delta:.0%})",
+            'unique_chars': self.unique_chars - {' ', '\n', '\t'},
+            'starting_letters': self.starting_letters,
+        }
+
+def sketch_text_file(path, **options):
+    """Stream one file line by line into a TextSketch"""
+    sketch = TextSketch(**options)
+    with open(path, encoding='utf-8') as text_file:
+        for line in text_file:
+            sketch.add_text(line)
+    return sketch
+
+def analyze_text_stream(lines, top_n=10, **options):
+    """Streaming analyze_text_uniqueness for an iterable of lines"""
+    sketch = TextSketch(**options)
+    for line in lines:
+        sketch.add_text(line)
+    return sketch.report(top_n)
+
+def analyze_text_files(paths, processes=1, top_n=10, **options):
+    """Sketch each file (shard) separately, in parallel if asked, then merge"""
+    if processes == 1:
+        sketches = [sketch_text_file(path, **options) for path in paths]
+    else:
+        with multiprocessing.Pool(processes) as pool:
+            sketches = pool.map(functools.partial(sketch_text_file, **options), paths)
+    merged = sketches[0] if sketches else TextSketch(**options)
+    for sketch in sketches[1:]:
+        merged.merge(sketch)
+    return merged.report(top_n)
+
+print(f"\nStreaming mode (HyperLogLog + Count-Min + Space-Saving):")
+corpus_lines = [sample_text] * 200 + [f"rare{i} token{i % 50}" for i in range(2000)]
+stream_report = analyze_text_stream(corpus_lines, top_n=3, precision=10)
+exact_unique = len(set(" ".join(corpus_lines).split()))
+print(f"Distinct words: ~{stream_report['unique_word_count']} "
+      f"{stream_report['unique_word_error']} (exact: {exact_unique})")
+print(f"Heavy hitters (word, count, max error): {stream_report['heavy_hitters']}")
+print(f"Count-Min error bound: {stream_report['count_error_bound']}")
+
 # Challenge 2: String duplicate finder
 def find_string_duplicates(strings):
     """Find duplicate characters and substrings in a list of strings"""
@@ -1177,56 +2510,434 @@ print(f"Strings with internal duplicates: {duplicates['strings_with_internal_dup
 print(f"All unique characters: {duplicates['all_unique_chars']}")
 
 # Challenge 3: Set-based cache
+class EvictionPolicy:
+    """Decides which key a cache evicts; SetCache calls these hooks"""
+    
+    name = "base"
+    
+    def on_hit(self, key):
+        """Key was found in the cache"""
+    
+    def on_miss(self, key):
+        """Key was looked up but not cached"""
+    
+    def on_insert(self, key):
+        """Key was added (room has already been made)"""
+    
+    def on_remove(self, key):
+        """Key was removed for a reason other than evict() (expiry, clear)"""
+    
+    def evict(self, incoming):
+        """Forget and return the key to evict to make room for incoming"""
+        raise NotImplementedError
+    
+    def clear(self):
+        """Forget all keys"""
+
+class LRUPolicy(EvictionPolicy):
+    """Least recently used: OrderedDict in recency order, O(1) per operation"""
+    
+    name = "lru"
+    
+    def __init__(self, capacity=None):
+        self.order = OrderedDict()
+    
+    def on_hit(self, key):
+        self.order.move_to_end(key)
+    
+    def on_insert(self, key):
+        self.order[key] = None
+    
+    def on_remove(self, key):
+        self.order.pop(key, None)
+    
+    def evict(self, incoming):
+        if not self.order:
+            return None
+        return self.order.popitem(last=False)[0]
+    
+    def clear(self):
+        self.order.clear()
+
+class LFUPolicy(EvictionPolicy):
+    """Least frequently used with O(1) frequency buckets (LRU among ties)"""
+    
+    name = "lfu"
+    
+    def __init__(self, capacity=None):
+        self.frequencies = {}                  # key -> access count
+        self.buckets = defaultdict(OrderedDict)  # count -> keys, oldest first
+        self.min_frequency = 0
+    
+    def _unlink(self, key):
+        """Take a key out of its frequency bucket"""
+        frequency = self.frequencies.pop(key)
+        bucket = self.buckets[frequency]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[frequency]
+        return frequency
+    
+    def on_hit(self, key):
+        frequency = self._unlink(key)
+        if self.min_frequency == frequency and frequency not in self.buckets:
+            self.min_frequency = frequency + 1
+        self.frequencies[key] = frequency + 1
+        self.buckets[frequency + 1][key] = None
+    
+    def on_insert(self, key):
+        self.frequencies[key] = 1
+        self.buckets[1][key] = None
+        self.min_frequency = 1
+    
+    def on_remove(self, key):
+        if key in self.frequencies:
+            self._unlink(key)
+    
+    def evict(self, incoming):
+        if not self.frequencies:
+            return None
+        if self.min_frequency not in self.buckets:
+            self.min_frequency = min(self.buckets)  # Only after on_remove
+        key = next(iter(self.buckets[self.min_frequency]))
+        self._unlink(key)
+        return key
+    
+    def clear(self):
+        self.frequencies.clear()
+        self.buckets.clear()
+        self.min_frequency = 0
+
+class ARCPolicy(EvictionPolicy):
+    """Adaptive Replacement Cache (Megiddo & Modha)
+    
+    T1 holds keys seen once recently, T2 keys seen at least twice. B1/B2
+    remember recently evicted keys; hits there shift the target size p of
+    T1 toward recency or frequency.
+    """
+    
+    name = "arc"
+    
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.p = 0.0
+        self.t1, self.t2 = OrderedDict(), OrderedDict()
+        self.b1, self.b2 = OrderedDict(), OrderedDict()
+        self._adapted_for = None
+    
+    def _adapt(self, key):
+        """Move p when a ghost entry is hit (once per incoming key)"""
+        if self._adapted_for == key:
+            return
+        self._adapted_for = key
+        if key in self.b1:
+            self.p = min(self.capacity, self.p + max(len(self.b2) / len(self.b1), 1))
+        elif key in self.b2:
+            self.p = max(0.0, self.p - max(len(self.b1) / len(self.b2), 1))
+    
+    def on_hit(self, key):
+        if key in self.t1:
+            del self.t1[key]
+            self.t2[key] = None
+        else:
+            self.t2.move_to_end(key)
+    
+    def evict(self, incoming):
+        self._adapt(incoming)
+        if self.t1 and (len(self.t1) > self.p or (incoming in self.b2 and len(self.t1) >= self.p)):
+            source, ghost = self.t1, self.b1
+        elif self.t2:
+            source, ghost = self.t2, self.b2
+        elif self.t1:
+            source, ghost = self.t1, self.b1
+        else:
+            return None
+        key = source.popitem(last=False)[0]
+        ghost[key] = None
+        return key
+    
+    def on_insert(self, key):
+        self._adapt(key)
+        self._adapted_for = None
+        if key in self.b1 or key in self.b2:
+            self.b1.pop(key, None)
+            self.b2.pop(key, None)
+            self.t2[key] = None
+        else:
+            self.t1[key] = None
+        # Keep the ghost lists bounded by the cache capacity
+        while self.b1 and len(self.t1) + len(self.b1) > self.capacity:
+            self.b1.popitem(last=False)
+        while self.b2 and len(self.t1) + len(self.t2) + len(self.b1) + len(self.b2) > 2 * self.capacity:
+            self.b2.popitem(last=False)
+    
+    def on_remove(self, key):
+        self.t1.pop(key, None)
+        self.t2.pop(key, None)
+    
+    def clear(self):
+        for segment in (self.t1, self.t2, self.b1, self.b2):
+            segment.clear()
+        self.p = 0.0
+
+class FrequencySketch:
+    """4-bit Count-Min sketch with periodic halving, as used by TinyLFU"""
+    
+    DEPTH = 4
+    
+    def __init__(self, capacity):
+        self.width = 1 << max(4, (capacity * 4 - 1).bit_length())
+        self.mask = self.width - 1
+        self.table = array('B', bytes(self.DEPTH * self.width))
+        self.sample_size = 10 * max(capacity, 1)
+        self.additions = 0
+    
+    def _slots(self, key):
+        """One counter index per row"""
+        return [row * self.width + (hash((row, key)) & self.mask) for row in range(self.DEPTH)]
+    
+    def increment(self, key):
+        for slot in self._slots(key):
+            if self.table[slot] < 15:
+                self.table[slot] += 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            # Aging: halve every counter so old popularity fades
+            self.table = array('B', (count >> 1 for count in self.table))
+            self.additions //= 2
+    
+    def estimate(self, key):
+        return min(self.table[slot] for slot in self._slots(key))
+
+class WTinyLFUPolicy(EvictionPolicy):
+    """W-TinyLFU: small LRU window plus a segmented LRU main area
+    
+    Keys pushed out of the window only enter the main area if the frequency
+    sketch says they are more popular than the main area's victim.
+    """
+    
+    name = "wtinylfu"
+    
+    def __init__(self, capacity, window_ratio=0.01):
+        self.window_size = max(1, int(capacity * window_ratio))
+        self.protected_size = max(1, int((capacity - self.window_size) * 0.8))
+        self.window = OrderedDict()
+        self.probation = OrderedDict()
+        self.protected = OrderedDict()
+        self.sketch = FrequencySketch(capacity)
+    
+    def on_miss(self, key):
+        self.sketch.increment(key)
+    
+    def on_hit(self, key):
+        self.sketch.increment(key)
+        if key in self.window:
+            self.window.move_to_end(key)
+        elif key in self.probation:
+            del self.probation[key]
+            self.protected[key] = None
+            if len(self.protected) > self.protected_size:
+                demoted = self.protected.popitem(last=False)[0]
+                self.probation[demoted] = None
+        else:
+            self.protected.move_to_end(key)
+    
+    def on_insert(self, key):
+        self.window[key] = None
+        if len(self.window) > self.window_size:
+            # Cache still has room: the window's oldest key moves to main
+            candidate = self.window.popitem(last=False)[0]
+            self.probation[candidate] = None
+    
+    def on_remove(self, key):
+        for segment in (self.window, self.probation, self.protected):
+            segment.pop(key, None)
+    
+    def _main_victim(self):
+        """Oldest probation key, else oldest protected key"""
+        for segment in (self.probation, self.protected):
+            if segment:
+                return segment, next(iter(segment))
+        return None, None
+    
+    def evict(self, incoming):
+        segment, victim = self._main_victim()
+        if len(self.window) < self.window_size or not self.window:
+            if segment is None:
+                return None
+            del segment[victim]
+            return victim
+        candidate = next(iter(self.window))
+        if segment is not None and self.sketch.estimate(candidate) > self.sketch.estimate(victim):
+            # Admission: the window candidate is more popular, so it replaces the victim
+            del segment[victim]
+            del self.window[candidate]
+            self.probation[candidate] = None
+            return victim
+        del self.window[candidate]
+        return candidate
+    
+    def clear(self):
+        for segment in (self.window, self.probation, self.protected):
+            segment.clear()
+
+EVICTION_POLICIES = {
+    policy.name: policy for policy in (LRUPolicy, LFUPolicy, ARCPolicy, WTinyLFUPolicy)
+}
+
 class SetCache:
-    """Simple cache using sets for fast lookups"""
+    """Cache with pluggable eviction, optional TTL and byte budget
+    
+    Values live in a dict; the eviction policy (LRU by default, or "lfu",
+    "arc", "wtinylfu", or any EvictionPolicy instance) tracks recency and
+    frequency in O(1) structures and picks victims.
+    """
     
-    def __init__(self, max_size=100):
+    def __init__(self, max_size=100, ttl=None, max_bytes=None, size_of=sys.getsizeof,
+                 policy="lru"):
         self.max_size = max_size
-        self.cache_keys = set()
-        self.cache_data = {}
-        self.access_order = []  # For LRU implementation
+        self.ttl = ttl              # Default time-to-live in seconds (None = forever)
+        self.max_bytes = max_bytes  # Byte budget across keys and values (None = unlimited)
+        self.size_of = size_of
+        if isinstance(policy, str):
+            policy = EVICTION_POLICIES[policy](max_size)
+        self.policy = policy
+        self.cache_data = {}  # key -> (value, expires_at, nbytes)
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def _is_expired(self, entry):
+        """Check an entry's deadline"""
+        expires_at = entry[1]
+        return expires_at is not None and time.monotonic() >= expires_at
+    
+    def _remove(self, key):
+        """Drop a key and its byte accounting"""
+        _, _, nbytes = self.cache_data.pop(key)
+        self.current_bytes -= nbytes
+    
+    def _over_limits(self, extra_entries=0, extra_bytes=0):
+        """Check whether the cache would exceed its size or byte budget"""
+        if len(self.cache_data) + extra_entries > self.max_size:
+            return True
+        return self.max_bytes is not None and self.current_bytes + extra_bytes > self.max_bytes
+    
+    def _make_room(self, incoming, extra_entries, extra_bytes):
+        """Evict policy-chosen keys until the incoming entry fits"""
+        while self.cache_data and self._over_limits(extra_entries, extra_bytes):
+            victim = self.policy.evict(incoming)
+            if victim is None:
+                break
+            if self._is_expired(self.cache_data[victim]):
+                self.expirations += 1
+            else:
+                self.evictions += 1
+            self._remove(victim)
     
     def get(self, key):
         """Get value from cache"""
-        if key in self.cache_keys:
-            # Move to end for LRU
-            self.access_order.remove(key)
-            self.access_order.append(key)
-            return self.cache_data[key]
-        return None
+        entry = self.cache_data.get(key)
+        if entry is not None and self._is_expired(entry):
+            self._remove(key)
+            self.policy.on_remove(key)
+            self.expirations += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            self.policy.on_miss(key)
+            return None
+        self.policy.on_hit(key)
+        self.hits += 1
+        return entry[0]
     
-    def put(self, key, value):
+    def put(self, key, value, ttl=None):
         """Put value in cache"""
-        if key in self.cache_keys:
-            # Update existing
-            self.cache_data[key] = value
-            self.access_order.remove(key)
-            self.access_order.append(key)
-        else:
-            # Add new
-            if len(self.cache_keys) >= self.max_size:
-                # Remove least recently used
-                lru_key = self.access_order.pop(0)
-                self.cache_keys.discard(lru_key)
-                del self.cache_data[lru_key]
-            
-            self.cache_keys.add(key)
-            self.cache_data[key] = value
-            self.access_order.append(key)
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        nbytes = self.size_of(key) + self.size_of(value)
+        too_big = self.max_bytes is not None and nbytes > self.max_bytes
+        if key in self.cache_data:
+            if too_big:
+                self._remove(key)
+                self.policy.on_remove(key)
+                return
+            # Updating a cached key counts as an access: the policy keeps its history
+            old_nbytes = self.cache_data[key][2]
+            self.cache_data[key] = (value, expires_at, nbytes)
+            self.current_bytes += nbytes - old_nbytes
+            self.policy.on_hit(key)
+            if self._over_limits():
+                self._make_room(key, 0, 0)  # A larger value can overflow max_bytes
+            return
+        if too_big:
+            return  # Larger than the whole budget: never cacheable
+        self._make_room(key, 1, nbytes)
+        self.cache_data[key] = (value, expires_at, nbytes)
+        self.current_bytes += nbytes
+        self.policy.on_insert(key)
     
     def contains(self, key):
         """Fast membership test"""
-        return key in self.cache_keys
+        entry = self.cache_data.get(key)
+        return entry is not None and not self._is_expired(entry)
     
     def clear(self):
         """Clear the cache"""
-        self.cache_keys.clear()
         self.cache_data.clear()
-        self.access_order.clear()
+        self.policy.clear()
+        self.current_bytes = 0
     
     def size(self):
         """Get cache size"""
-        return len(self.cache_keys)
+        return len(self.cache_data)
+    
+    def stats(self):
+        """Get hit/miss/eviction counters"""
+        lookups = self.hits + self.misses
+        return {
+            'policy': self.policy.name,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'size': len(self.cache_data),
+            'bytes': self.current_bytes,
+        }
+
+class ThreadSafeSetCache(SetCache):
+    """SetCache guarded by a lock for use from multiple threads"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            return super().get(key)
+    
+    def put(self, key, value, ttl=None):
+        with self._lock:
+            super().put(key, value, ttl)
+    
+    def contains(self, key):
+        with self._lock:
+            return super().contains(key)
+    
+    def clear(self):
+        with self._lock:
+            super().clear()
+    
+    def size(self):
+        with self._lock:
+            return super().size()
+    
+    def stats(self):
+        with self._lock:
+            return super().stats()
 
 print(f"\nChallenge 3 - Set-based Cache:")
 cache = SetCache(max_size=3)
@@ -1245,6 +2956,84 @@ cache.put("user4", {"name": "Diana", "age": 28})
 print(f"After adding user4:")
 print(f"  Contains 'user1': {cache.contains('user1')}")  # Should be False (evicted)
 print(f"  Contains 'user4': {cache.contains('user4')}")  # Should be True
+print(f"  Stats: {cache.stats()}")
+
+# TTL expiry and byte budget
+ttl_cache = SetCache(max_size=10, ttl=0.05)
+ttl_cache.put("session", "abc123")
+ttl_cache.put("config", {"debug": True}, ttl=60)
+time.sleep(0.06)
+print(f"After TTL: session={ttl_cache.get('session')}, config={ttl_cache.get('config')}")
+
+byte_cache = SetCache(max_size=100, max_bytes=600)
+for i in range(10):
+    byte_cache.put(i, "x" * 100)
+print(f"Byte budget 600: {byte_cache.size()} entries, {byte_cache.current_bytes} bytes, "
+      f"{byte_cache.evictions} evictions")
+
+# Thread-safe variant shared by several threads
+shared_cache = ThreadSafeSetCache(max_size=50)
+def cache_worker(worker_id):
+    for i in range(1000):
+        key = random.randrange(80)
+        if shared_cache.get(key) is None:
+            shared_cache.put(key, key * worker_id)
+threads = [threading.Thread(target=cache_worker, args=(n,)) for n in range(4)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+print(f"Thread-safe cache after 4 threads: {shared_cache.stats()}")
+
+# Choosing an eviction policy from data: replay an access trace
+def load_trace(path):
+    """Read a key-access trace: one key per line"""
+    with open(path, encoding='utf-8') as trace_file:
+        for line in trace_file:
+            key = line.strip()
+            if key:
+                yield key
+
+def zipf_trace(num_keys, length, exponent=1.0, seed=42):
+    """Synthetic skewed trace: key k is requested with probability ~ 1/k^exponent"""
+    rng = random.Random(seed)
+    cum_weights = list(itertools.accumulate(1 / rank ** exponent for rank in range(1, num_keys + 1)))
+    return rng.choices(range(num_keys), cum_weights=cum_weights, k=length)
+
+def replay_trace(cache, trace):
+    """Read-through replay: every miss loads the key into the cache"""
+    for key in trace:
+        if cache.get(key) is None:
+            cache.put(key, key)
+
+def benchmark_cache_policies(trace, max_size, policies=None):
+    """Replay one trace per policy; report hit ratio, ops/sec and memory"""
+    trace = list(trace)
+    results = {}
+    for name in policies or EVICTION_POLICIES:
+        cache = SetCache(max_size=max_size, policy=name)
+        start = time.perf_counter()
+        replay_trace(cache, trace)
+        elapsed = time.perf_counter() - start
+        # Measure memory on a second replay; tracemalloc slows the timed run
+        tracemalloc.start()
+        measured_cache = SetCache(max_size=max_size, policy=name)
+        replay_trace(measured_cache, trace)
+        memory_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del measured_cache
+        results[name] = {
+            'hit_ratio': cache.stats()['hit_ratio'],
+            'ops_per_sec': len(trace) / elapsed if elapsed else float('inf'),
+            'memory_bytes': memory_bytes,
+        }
+    return results
+
+print(f"\nEviction policy benchmark (Zipf trace, 20,000 requests, 1,000 keys, cache of 100):")
+policy_results = benchmark_cache_policies(zipf_trace(1000, 20_000), max_size=100)
+for name, result in policy_results.items():
+    print(f"  {name:9}: hit ratio {result['hit_ratio']:.3f}, "
+          f"{result['ops_per_sec']:>9,.0f} ops/sec, {result['memory_bytes']:>7,} bytes")
 
 # Challenge 4: Friend recommendations
 class SocialNetwork:
@@ -1276,23 +3065,54 @@ class SocialNetwork:
         friends2 = self.get_friends(user2)
         return friends1 & friends2
     
-    def suggest_friends(self, user, max_suggestions=5):
-        """Suggest friends based on mutual connections"""
+    def suggest_friends(self, user, max_suggestions=5, scoring="mutual",
+                        max_friend_degree=None, seed=None, with_scores=False):
+        """Suggest friends ranked by mutual connections, best first
+        
+        scoring: "mutual" (number of mutual friends) or "adamic_adar"
+        (mutual friends weighted by 1/log(their degree)). Friends with more
+        than max_friend_degree connections are sampled to bound the work.
+        """
+        if scoring not in ("mutual", "adamic_adar"):
+            raise ValueError(f"Unknown scoring: {scoring}")
         if user not in self.users:
-            return set()
+            return []
         
+        rng = random.Random(seed)
         user_friends = self.get_friends(user)
-        suggestions = set()
+        scores = defaultdict(float)
         
-        # Find friends of friends
+        # Friends of friends, each credited once per mutual friend
         for friend in user_friends:
             friend_friends = self.get_friends(friend)
-            # Suggest people who are friends of friends but not already friends
-            potential = friend_friends - user_friends - {user}
-            suggestions |= potential
+            degree = len(friend_friends)
+            weight = 1 / math.log(degree) if scoring == "adamic_adar" and degree > 1 else 1.0
+            if max_friend_degree and degree > max_friend_degree:
+                friend_friends = rng.sample(list(friend_friends), max_friend_degree)
+                weight *= degree / max_friend_degree  # Keep the expected score unbiased
+            for candidate in friend_friends:
+                if candidate != user and candidate not in user_friends:
+                    scores[candidate] += weight
+        
+        top = heapq.nlargest(max_suggestions, scores.items(), key=operator.itemgetter(1))
+        return top if with_scores else [candidate for candidate, _ in top]
+    
+    def suggest_friends_for_all(self, max_suggestions=5, processes=1, **options):
+        """Suggestions for every user: {user: [suggestions]}
         
-        # Limit suggestions
-        return set(list(suggestions)[:max_suggestions])
+        With processes > 1 the users are split into shards and ranked in a
+        multiprocessing pool; each worker receives the network once.
+        """
+        users = list(self.users)
+        if processes == 1:
+            return {user: self.suggest_friends(user, max_suggestions, **options) for user in users}
+        shards = [(users[i::processes], max_suggestions, options) for i in range(processes)]
+        suggestions = {}
+        with multiprocessing.Pool(processes, initializer=_init_network_worker,
+                                  initargs=(self,)) as pool:
+            for shard_suggestions in pool.imap_unordered(_suggest_friends_shard, shards):
+                suggestions.update(shard_suggestions)
+        return suggestions
     
     def get_network_stats(self):
         """Get network statistics"""
@@ -1302,6 +3122,296 @@ class SocialNetwork:
             'total_friendships': total_friendships,
             'average_friends': total_friendships * 2 / len(self.users) if self.users else 0
         }
+    
+    def shortest_path(self, user1, user2):
+        """Shortest friendship chain from user1 to user2 (bidirectional BFS), or None"""
+        if user1 not in self.users or user2 not in self.users:
+            return None
+        if user1 == user2:
+            return [user1]
+        # Each side records how it reached a user; expand the smaller frontier
+        parents1, parents2 = {user1: None}, {user2: None}
+        frontier1, frontier2 = [user1], [user2]
+        while frontier1 and frontier2:
+            if len(frontier1) > len(frontier2):
+                frontier1, frontier2 = frontier2, frontier1
+                parents1, parents2 = parents2, parents1
+            next_frontier = []
+            for user in frontier1:
+                for friend in self.get_friends(user):
+                    if friend in parents1:
+                        continue
+                    parents1[friend] = user
+                    if friend in parents2:
+                        # The searches met: stitch both parent chains together
+                        path = []
+                        node = friend
+                        while node is not None:
+                            path.append(node)
+                            node = parents1[node]
+                        path.reverse()
+                        node = parents2[friend]
+                        while node is not None:
+                            path.append(node)
+                            node = parents2[node]
+                        return path if path[0] == user1 else path[::-1]
+                    next_frontier.append(friend)
+            frontier1 = next_frontier
+        return None
+    
+    def degrees_of_separation(self, user1, user2):
+        """Number of friendship hops between two users, or None if unconnected"""
+        path = self.shortest_path(user1, user2)
+        return len(path) - 1 if path else None
+    
+    def connected_components(self):
+        """Groups of users reachable from each other (union-find)"""
+        components = UnionFind(self.users)
+        for user in self.users:
+            for friend in self.get_friends(user):
+                components.union(user, friend)
+        return components.groups()
+    
+    def triangle_counts(self, processes=1):
+        """Triangles each user belongs to: {user: count}
+        
+        Edges are oriented from lower to higher (degree, id) rank so each
+        triangle is found exactly once; processes > 1 counts shards of users
+        in a multiprocessing pool.
+        """
+        oriented = _oriented_adjacency(self)
+        if processes == 1:
+            counts = _count_triangles(oriented, oriented)
+        else:
+            users = list(oriented)
+            shards = [users[i::processes] for i in range(processes)]
+            counts = Counter()
+            with multiprocessing.Pool(processes, initializer=_init_triangle_worker,
+                                      initargs=(oriented,)) as pool:
+                for shard_counts in pool.imap_unordered(_count_triangles_shard, shards):
+                    counts.update(shard_counts)
+        return {user: counts.get(user, 0) for user in self.users}
+    
+    def total_triangles(self, processes=1):
+        """Number of distinct triangles in the network"""
+        return sum(self.triangle_counts(processes).values()) // 3
+    
+    def clustering_coefficient(self, user, triangles=None):
+        """Fraction of a user's friend pairs that are friends themselves"""
+        friends = self.get_friends(user) - {user}  # A self-loop is not a friend pair
+        degree = len(friends)
+        if degree < 2:
+            return 0.0
+        if triangles is None:
+            # Only this user's triangles: each friend pair is seen from both ends
+            triangles = 0
+            for friend in friends:
+                their_friends = self.get_friends(friend)
+                triangles += len(friends & their_friends) - (friend in their_friends)
+            triangles //= 2
+        return 2 * triangles / (degree * (degree - 1))
+    
+    def average_clustering(self, processes=1):
+        """Mean clustering coefficient over all users"""
+        if not self.users:
+            return 0.0
+        triangles = self.triangle_counts(processes)
+        return sum(self.clustering_coefficient(user, triangles[user])
+                   for user in self.users) / len(self.users)
+    
+    def to_csr(self):
+        """Convert to the compact read-only CSR backend"""
+        # Both directions are listed; from_edges drops the duplicates
+        edges = ((user, friend) for user, friends in self.friendships.items()
+                 for friend in friends)
+        return CSRSocialNetwork.from_edges(edges, users=self.users)
+
+class CSRSocialNetwork(SocialNetwork):
+    """Read-only social network in compressed sparse row (CSR) form
+    
+    User names are interned to ints. The friends of user i are the sorted
+    ids neighbors[offsets[i]:offsets[i + 1]], so each friendship costs
+    8 bytes (two int32 entries) instead of two set slots and pointers.
+    """
+    
+    def __init__(self, user_names, offsets, neighbors):
+        self.user_names = user_names  # id -> name
+        self.user_ids = {name: user_id for user_id, name in enumerate(user_names)}
+        self.offsets = offsets        # array('q'), len(users) + 1
+        self.neighbors = neighbors    # array('i'), sorted within each row
+    
+    @classmethod
+    def from_edges(cls, edges, users=()):
+        """Bulk-build from (user1, user2) pairs; duplicates and self-loops are dropped"""
+        user_ids = {}
+        user_names = []
+        
+        def intern(name):
+            user_id = user_ids.get(name)
+            if user_id is None:
+                user_id = user_ids[name] = len(user_names)
+                user_names.append(name)
+            return user_id
+        
+        for user in users:
+            intern(user)
+        sources, targets = array('i'), array('i')
+        for user1, user2 in edges:
+            if user1 != user2:
+                sources.append(intern(user1))
+                targets.append(intern(user2))
+        
+        # Counting pass: degrees -> row offsets
+        counts = array('q', bytes(8 * (len(user_names) + 1)))
+        for user_id in itertools.chain(sources, targets):
+            counts[user_id + 1] += 1
+        offsets = array('q', itertools.accumulate(counts))
+        
+        # Scatter both directions of every edge into its row
+        neighbors = array('i', bytes(4 * offsets[-1]))
+        cursor = array('q', offsets[:-1])
+        for source, target in zip(sources, targets):
+            neighbors[cursor[source]] = target
+            cursor[source] += 1
+            neighbors[cursor[target]] = source
+            cursor[target] += 1
+        
+        # Sort and deduplicate each row
+        compact_offsets = array('q', [0])
+        compact_neighbors = array('i')
+        for user_id in range(len(user_names)):
+            compact_neighbors.extend(sorted(set(neighbors[offsets[user_id]:offsets[user_id + 1]])))
+            compact_offsets.append(len(compact_neighbors))
+        return cls(user_names, compact_offsets, compact_neighbors)
+    
+    @property
+    def users(self):
+        return self.user_ids.keys()
+    
+    def add_user(self, user):
+        raise TypeError("CSRSocialNetwork is read-only; use to_set_network() to modify it")
+    
+    def add_friendship(self, user1, user2):
+        raise TypeError("CSRSocialNetwork is read-only; use to_set_network() to modify it")
+    
+    def friend_ids(self, user_id):
+        """Sorted friend ids of a user id, as an array slice"""
+        return self.neighbors[self.offsets[user_id]:self.offsets[user_id + 1]]
+    
+    def get_friends(self, user):
+        """Get user's friends"""
+        user_id = self.user_ids.get(user)
+        if user_id is None:
+            return set()
+        return {self.user_names[friend_id] for friend_id in self.friend_ids(user_id)}
+    
+    def get_mutual_friends(self, user1, user2):
+        """Get mutual friends between two users (sorted-array intersection)"""
+        id1, id2 = self.user_ids.get(user1), self.user_ids.get(user2)
+        if id1 is None or id2 is None:
+            return set()
+        common = intersect_sorted(self.friend_ids(id1), self.friend_ids(id2))
+        return {self.user_names[friend_id] for friend_id in common}
+    
+    def get_network_stats(self):
+        """Get network statistics"""
+        total_users = len(self.user_names)
+        total_friendships = len(self.neighbors) // 2
+        return {
+            'total_users': total_users,
+            'total_friendships': total_friendships,
+            'average_friends': total_friendships * 2 / total_users if total_users else 0
+        }
+    
+    def to_csr(self):
+        return self
+    
+    def to_set_network(self):
+        """Convert back to the mutable set-based backend"""
+        network = SocialNetwork()
+        for user in self.user_names:
+            network.add_user(user)
+        for user_id, user in enumerate(self.user_names):
+            network.friendships[user] = {self.user_names[friend_id]
+                                         for friend_id in self.friend_ids(user_id)}
+        return network
+
+class UnionFind:
+    """Disjoint sets with union by size and path halving"""
+    
+    def __init__(self, items=()):
+        self.parent = {item: item for item in items}
+        self.size = {item: 1 for item in self.parent}
+    
+    def find(self, item):
+        """Representative of item's set"""
+        if item not in self.parent:
+            self.parent[item] = item
+            self.size[item] = 1
+        while self.parent[item] != item:
+            self.parent[item] = self.parent[self.parent[item]]
+            item = self.parent[item]
+        return item
+    
+    def union(self, item1, item2):
+        """Merge the sets containing item1 and item2"""
+        root1, root2 = self.find(item1), self.find(item2)
+        if root1 == root2:
+            return
+        if self.size[root1] < self.size[root2]:
+            root1, root2 = root2, root1
+        self.parent[root2] = root1
+        self.size[root1] += self.size[root2]
+    
+    def groups(self):
+        """All sets, largest first"""
+        groups = defaultdict(set)
+        for item in self.parent:
+            groups[self.find(item)].add(item)
+        return sorted(groups.values(), key=len, reverse=True)
+
+def _oriented_adjacency(network):
+    """Keep only edges toward higher-ranked users (rank = degree, then position)"""
+    users = list(network.users)
+    friends = {user: network.get_friends(user) - {user} for user in users}  # Drop self-loops
+    rank = {user: (len(friends[user]), position) for position, user in enumerate(users)}
+    return {user: {friend for friend in friends[user] if rank[friend] > rank[user]}
+            for user in users}
+
+def _count_triangles(oriented, users):
+    """Per-user triangle counts for triangles whose lowest-ranked user is in users"""
+    counts = Counter()
+    for user in users:
+        higher = oriented[user]
+        for friend in higher:
+            for third in higher & oriented[friend]:
+                counts[user] += 1
+                counts[friend] += 1
+                counts[third] += 1
+    return counts
+
+_worker_network = None
+_worker_oriented = None
+
+def _init_triangle_worker(oriented):
+    """Pool initializer: keep one copy of the oriented graph per worker process"""
+    global _worker_oriented
+    _worker_oriented = oriented
+
+def _count_triangles_shard(users):
+    """Count triangles for one shard of users inside a worker"""
+    return _count_triangles(_worker_oriented, users)
+
+def _init_network_worker(network):
+    """Pool initializer: keep one copy of the network per worker process"""
+    global _worker_network
+    _worker_network = network
+
+def _suggest_friends_shard(shard):
+    """Rank suggestions for one shard of users inside a worker"""
+    users, max_suggestions, options = shard
+    return {user: _worker_network.suggest_friends(user, max_suggestions, **options)
+            for user in users}
 
 print(f"\nChallenge 4 - Social Network Friend Recommendations:")
 network = SocialNetwork()
@@ -1330,17 +3440,115 @@ for user in users:
 print(f"\nMutual friends between Alice and Diana: {network.get_mutual_friends('Alice', 'Diana')}")
 print(f"Friend suggestions for Alice: {network.suggest_friends('Alice')}")
 print(f"Friend suggestions for Eve: {network.suggest_friends('Eve')}")
+print(f"Ranked for Alice (mutual): {network.suggest_friends('Alice', with_scores=True)}")
+print(f"Ranked for Alice (Adamic-Adar): {network.suggest_friends('Alice', scoring='adamic_adar', with_scores=True)}")
+print(f"Suggestions for everyone (pass processes=N to shard across a pool):")
+for user, suggestions in network.suggest_friends_for_all(max_suggestions=2).items():
+    print(f"  {user}: {suggestions}")
 
 stats = network.get_network_stats()
 print(f"Network stats: {stats}")
 
+# Compact CSR backend: same read API, built in bulk from an edge list
+csr_network = network.to_csr()
+print(f"CSR offsets: {list(csr_network.offsets)}")
+print(f"CSR neighbors: {list(csr_network.neighbors)}")
+print(f"CSR mutual friends Alice/Diana: {csr_network.get_mutual_friends('Alice', 'Diana')}")
+print(f"CSR suggestions for Alice: {csr_network.suggest_friends('Alice')}")
+print(f"CSR stats: {csr_network.get_network_stats()}")
+print(f"Round trip equal: {csr_network.to_set_network().friendships == network.friendships}")
+
+# Graph analytics
+network.add_user("Grace")
+network.add_user("Heidi")
+network.add_friendship("Grace", "Heidi")
+network.add_friendship("Alice", "Diana")
+print(f"\nShortest path Alice → Frank: {network.shortest_path('Alice', 'Frank')}")
+print(f"Degrees of separation Charlie → Eve: {network.degrees_of_separation('Charlie', 'Eve')}")
+print(f"Degrees of separation Alice → Grace: {network.degrees_of_separation('Alice', 'Grace')}")
+print(f"Connected components: {network.connected_components()}")
+print(f"Triangles per user: {network.triangle_counts()}")
+print(f"Total triangles: {network.total_triangles()}")
+print(f"Clustering coefficient of Alice: {network.clustering_coefficient('Alice'):.3f}")
+print(f"Average clustering (processes=N parallelizes triangle counting): {network.average_clustering():.3f}")
+
 # Challenge 5: Data validation
+class DomainSuffixIndex:
+    """Domain rules in one flat dict: domain -> (exact action, subdomain action)
+    
+    "spam.com" sets both actions, so it matches spam.com and every
+    subdomain; "*.spam.com" sets only the subdomain action. A lookup probes
+    the domain itself, then each parent suffix from the most specific up,
+    so it costs one dict probe per label whatever the number of rules. The
+    first hit is the most specific rule, so an allow rule for good.spam.com
+    overrides a block on spam.com. The action pairs are shared tuples, so
+    each rule costs about what one string in a set does.
+    """
+    
+    BLOCK = 'block'
+    ALLOW = 'allow'
+    
+    def __init__(self):
+        self.rules = {}          # domain -> (exact action, subdomain action)
+        self._action_pairs = {}  # One shared tuple per distinct pair
+        self.rule_count = 0
+    
+    def add(self, pattern, action=BLOCK):
+        """Add one domain pattern"""
+        pattern = pattern.strip().lower().rstrip('.')
+        if pattern.startswith('*.'):
+            pattern = pattern[2:]
+            pair = (self.rules.get(pattern, (None, None))[0], action)
+        else:
+            pair = (action, action)
+        self.rules[pattern] = self._action_pairs.setdefault(pair, pair)
+        self.rule_count += 1
+    
+    def update(self, patterns, action=BLOCK):
+        """Add many patterns"""
+        for pattern in patterns:
+            self.add(pattern, action)
+    
+    def load(self, path, action=BLOCK):
+        """Load a blocklist file: one domain per line, '#' comments, hosts-file lines allowed"""
+        with open(path, encoding='utf-8') as rules_file:
+            for line in rules_file:
+                line = line.split('#', 1)[0].split()
+                if line:
+                    self.add(line[-1], action)
+    
+    def match(self, domain):
+        """Action of the most specific rule covering domain, or None"""
+        domain = domain.lower().rstrip('.')
+        rules = self.rules
+        pair = rules.get(domain)
+        if pair is not None and pair[0] is not None:
+            return pair[0]
+        dot = domain.find('.')
+        while dot != -1:
+            pair = rules.get(domain[dot + 1:])
+            if pair is not None and pair[1] is not None:
+                return pair[1]
+            dot = domain.find('.', dot + 1)
+        return None
+    
+    def patterns(self, action=BLOCK):
+        """Yield the patterns stored with action ('x' or '*.x' form)"""
+        for domain, (exact, subdomains) in self.rules.items():
+            if exact == action:
+                yield domain
+            elif subdomains == action:
+                yield '*.' + domain
+    
+    def __len__(self):
+        return self.rule_count
+
 class DataValidator:
     """Data validator using sets for allowed values"""
     
     def __init__(self):
         self.valid_emails = set()
-        self.blocked_domains = set()
+        self.domain_rules = DomainSuffixIndex()
         self.required_fields = set()
         self.valid_statuses = set()
     
@@ -1349,8 +3557,21 @@ class DataValidator:
         self.valid_emails.add(email.lower())
     
     def add_blocked_domain(self, domain):
-        """Add domain to blacklist"""
-        self.blocked_domains.add(domain.lower())
+        """Add domain to blacklist (also blocks its subdomains; '*.x' blocks only subdomains)"""
+        self.domain_rules.add(domain, DomainSuffixIndex.BLOCK)
+    
+    @property
+    def blocked_domains(self):
+        """Blocked patterns, read back from the suffix index"""
+        return set(self.domain_rules.patterns(DomainSuffixIndex.BLOCK))
+    
+    def add_allowed_domain(self, domain):
+        """Whitelist a domain pattern as an exception to broader blocks"""
+        self.domain_rules.add(domain, DomainSuffixIndex.ALLOW)
+    
+    def load_blocked_domains(self, path):
+        """Bulk-load a blocklist file straight into the suffix index"""
+        self.domain_rules.load(path, DomainSuffixIndex.BLOCK)
     
     def set_required_fields(self, fields):
         """Set required fields"""
@@ -1371,7 +3592,7 @@ class DataValidator:
         # Check domain blacklist
         if '@' in email:
             domain = email.split('@')[1]
-            if domain in self.blocked_domains:
+            if self.domain_rules.match(domain) == DomainSuffixIndex.BLOCK:
                 return False, f"Domain {domain} is blocked"
         
         return True, "Valid"
@@ -1398,6 +3619,121 @@ class DataValidator:
                 errors.append(f"Email error: {message}")
         
         return len(errors) == 0, errors
+    
+    # Compact error codes for batch validation: one bit per failed rule
+    MISSING_FIELDS = 1
+    INVALID_STATUS = 2
+    EMAIL_NOT_WHITELISTED = 4
+    EMAIL_DOMAIN_BLOCKED = 8
+    ERROR_NAMES = {
+        MISSING_FIELDS: 'missing_fields',
+        INVALID_STATUS: 'invalid_status',
+        EMAIL_NOT_WHITELISTED: 'email_not_whitelisted',
+        EMAIL_DOMAIN_BLOCKED: 'email_domain_blocked',
+    }
+    
+    def compile_rules(self):
+        """Bundle the current rules into a picklable tuple for batch validation"""
+        return (frozenset(self.required_fields), frozenset(self.valid_statuses),
+                frozenset(self.valid_emails), self.domain_rules)
+    
+    @classmethod
+    def describe_error_code(cls, code):
+        """Turn an error code back into rule names"""
+        return [name for flag, name in cls.ERROR_NAMES.items() if code & flag]
+    
+    def validate_stream(self, source, chunk_size=10_000, processes=1):
+        """Validate records in chunks, yielding (first_row, codes) per chunk
+        
+        source is an iterable of dicts or a .csv/.jsonl path. codes is an
+        array('B') with one error code per row (0 = valid). With
+        processes > 1 the chunks are validated in a multiprocessing pool.
+        """
+        rules = self.compile_rules()
+        if isinstance(source, str):
+            source = read_records(source)
+        chunks = chunked(source, chunk_size)
+        if processes == 1:
+            results = (validation_codes(rules, chunk) for chunk in chunks)
+            first_row = 0
+            for codes in results:
+                yield first_row, codes
+                first_row += len(codes)
+            return
+        with multiprocessing.Pool(processes, initializer=_init_validation_worker,
+                                  initargs=(rules,)) as pool:
+            first_row = 0
+            for codes in pool.imap(_validate_chunk, chunks):
+                yield first_row, codes
+                first_row += len(codes)
+    
+    def validate_batch(self, source, chunk_size=10_000, processes=1):
+        """Validate many records: (codes array, histogram of errors)"""
+        all_codes = array('B')
+        for _, codes in self.validate_stream(source, chunk_size, processes):
+            all_codes.extend(codes)
+        histogram = Counter()
+        for code, rows in Counter(all_codes).items():
+            if code == 0:
+                histogram['valid'] += rows
+            for name in self.describe_error_code(code):
+                histogram[name] += rows
+        return all_codes, histogram
+
+def chunked(iterable, size):
+    """Split an iterable into lists of up to size items"""
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+def read_records(path):
+    """Stream dict records from a .jsonl or .csv file
+    
+    Empty CSV cells are dropped so they count as missing fields.
+    """
+    with open(path, encoding='utf-8', newline='') as records_file:
+        if path.endswith('.jsonl'):
+            for line in records_file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            for row in csv.DictReader(records_file):
+                yield {key: value for key, value in row.items() if value not in (None, '')}
+
+def validation_codes(rules, records):
+    """Apply compiled rules to records; one error code per record"""
+    required, statuses, whitelist, domain_rules = rules
+    block = DomainSuffixIndex.BLOCK
+    missing_fields = DataValidator.MISSING_FIELDS
+    invalid_status = DataValidator.INVALID_STATUS
+    not_whitelisted = DataValidator.EMAIL_NOT_WHITELISTED
+    domain_blocked = DataValidator.EMAIL_DOMAIN_BLOCKED
+    codes = array('B')
+    for record in records:
+        code = 0
+        if required and not required <= record.keys():
+            code |= missing_fields
+        if statuses and 'status' in record and record['status'] not in statuses:
+            code |= invalid_status
+        if 'email' in record:
+            email = record['email'].lower()
+            if whitelist and email not in whitelist:
+                code |= not_whitelisted
+            elif domain_rules.rule_count and '@' in email and domain_rules.match(email.split('@')[1]) == block:
+                code |= domain_blocked
+        codes.append(code)
+    return codes
+
+_worker_rules = None
+
+def _init_validation_worker(rules):
+    """Pool initializer: keep the compiled rules in each worker"""
+    global _worker_rules
+    _worker_rules = rules
+
+def _validate_chunk(records):
+    """Validate one chunk inside a worker"""
+    return validation_codes(_worker_rules, records)
 
 print(f"\nChallenge 5 - Data Validation:")
 validator = DataValidator()
@@ -1424,6 +3760,18 @@ for i, record in enumerate(test_records, 1):
     if errors:
         print(f"    Errors: {errors}")
 
+# Batch validation: compiled rules, compact codes and a histogram
+codes, histogram = validator.validate_batch(test_records * 1000, chunk_size=500)
+print(f"\nBatch of {len(codes):,} records (pass processes=N to use a pool):")
+print(f"  First codes: {list(codes[:4])} → {[validator.describe_error_code(code) for code in codes[:4]]}")
+print(f"  Histogram: {dict(histogram)}")
+
+# Suffix index: blocking a domain also blocks its subdomains
+validator.add_blocked_domain('*.example.org')
+validator.add_allowed_domain('partners.spam.com')
+for email in ['eve@mail.spam.com', 'joe@partners.spam.com', 'ann@example.org', 'sam@dev.example.org']:
+    print(f"  {email}: {validator.validate_email(email)}")
+
 print("\n" + "=" * 50)
 print("1️⃣4️⃣ Performance Optimization Tips")
 print("=" * 50)
@@ -1524,5 +3872,439 @@ print(f"  Frozenset creation: {frozenset_time:.6f} seconds")
 print(f"  Memory: frozensets are more memory efficient for large collections")
 print(f"  Use case: When you need immutable sets or sets as dict keys")
 
+# Tip 4: Probabilistic membership when the exact set does not fit in memory
+print(f"\n💡 Tip 4: Bloom and Cuckoo Filters for Huge Key Sets")
+
+def item_digest(item):
+    """Stable 128-bit hash of an item as two 64-bit halves"""
+    if isinstance(item, str):
+        data = item.encode()
+    elif isinstance(item, (bytes, bytearray)):
+        data = bytes(item)
+    else:
+        data = repr(item).encode()
+    digest = hashlib.blake2b(data, digest_size=16).digest()
+    return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little')
+
+class BloomFilter:
+    """Bit array + k hash positions: no false negatives, tunable false positives"""
+    
+    HEADER = struct.Struct('<4sQIQ')  # magic, bit count, hash count, items added
+    MAGIC = b'BLM1'
+    
+    def __init__(self, capacity, error_rate=0.01):
+        # Optimal sizing: m = -n ln p / (ln 2)^2 bits, k = (m / n) ln 2 hashes
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+    
+    def _positions(self, item):
+        """k bit positions by double hashing"""
+        h1, h2 = item_digest(item)
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+    
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+    
+    def update(self, items):
+        """Bulk add from any iterable"""
+        for item in items:
+            self.add(item)
+    
+    def __contains__(self, item):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+    
+    def __len__(self):
+        return self.count
+    
+    def memory_bytes(self):
+        return len(self.bits)
+    
+    def to_bytes(self):
+        return self.HEADER.pack(self.MAGIC, self.num_bits, self.num_hashes, self.count) + bytes(self.bits)
+    
+    @classmethod
+    def from_bytes(cls, data):
+        """Rebuild a filter; data may be bytes or a (read-only) mmap"""
+        magic, num_bits, num_hashes, count = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC:
+            raise ValueError("Not a BloomFilter image")
+        bloom = cls.__new__(cls)
+        bloom.num_bits, bloom.num_hashes, bloom.count = num_bits, num_hashes, count
+        bloom.bits = memoryview(data)[cls.HEADER.size:] if isinstance(data, mmap.mmap) else bytearray(data[cls.HEADER.size:])
+        return bloom
+    
+    def save(self, path):
+        with open(path, 'wb') as filter_file:
+            filter_file.write(self.to_bytes())
+    
+    @classmethod
+    def load(cls, path, use_mmap=True):
+        """Load from disk; with use_mmap the bits stay in the page cache (read-only)"""
+        with open(path, 'rb') as filter_file:
+            if use_mmap:
+                return cls.from_bytes(mmap.mmap(filter_file.fileno(), 0, access=mmap.ACCESS_READ))
+            return cls.from_bytes(filter_file.read())
+
+class CuckooFilter:
+    """Buckets of small fingerprints with two candidate buckets per item
+    
+    Supports deletion, and at low error rates uses less space than a Bloom
+    filter. add() returns False when the filter is too full.
+    """
+    
+    BUCKET_SIZE = 4
+    MAX_KICKS = 500
+    HEADER = struct.Struct('<4sQBQ')  # magic, bucket count, fingerprint bits, items
+    MAGIC = b'CKO1'
+    
+    def __init__(self, capacity, error_rate=0.01):
+        # Fingerprint bits f >= log2(2b / error_rate); stored in 8/16/32-bit slots
+        bits_needed = math.ceil(math.log2(2 * self.BUCKET_SIZE / error_rate))
+        self.fingerprint_bits = 8 if bits_needed <= 8 else 16 if bits_needed <= 16 else 32
+        buckets = max(1, math.ceil(capacity / (self.BUCKET_SIZE * 0.95)))
+        self.num_buckets = 1 << (buckets - 1).bit_length()  # Power of two for XOR indexing
+        self.table = array(self._typecode(), bytes(self.num_buckets * self.BUCKET_SIZE * self.fingerprint_bits // 8))
+        self.count = 0
+        self._rng = random.Random(0)
+    
+    def _typecode(self):
+        return {8: 'B', 16: 'H', 32: 'I'}[self.fingerprint_bits]
+    
+    def _fingerprint_and_index(self, item):
+        h1, h2 = item_digest(item)
+        fingerprint = h2 % ((1 << self.fingerprint_bits) - 1) + 1  # 0 marks an empty slot
+        return fingerprint, h1 & (self.num_buckets - 1)
+    
+    def _alt_index(self, index, fingerprint):
+        """Partial-key cuckoo hashing: the other bucket from index and fingerprint alone"""
+        return (index ^ (fingerprint * 0x5BD1E995)) & (self.num_buckets - 1)
+    
+    def _bucket(self, index):
+        start = index * self.BUCKET_SIZE
+        return range(start, start + self.BUCKET_SIZE)
+    
+    def _insert_into(self, index, fingerprint):
+        for slot in self._bucket(index):
+            if self.table[slot] == 0:
+                self.table[slot] = fingerprint
+                return True
+        return False
+    
+    def add(self, item):
+        fingerprint, index1 = self._fingerprint_and_index(item)
+        index2 = self._alt_index(index1, fingerprint)
+        if self._insert_into(index1, fingerprint) or self._insert_into(index2, fingerprint):
+            self.count += 1
+            return True
+        # Both full: evict a resident fingerprint to its other bucket, repeatedly
+        index = self._rng.choice((index1, index2))
+        swaps = []
+        for _ in range(self.MAX_KICKS):
+            slot = index * self.BUCKET_SIZE + self._rng.randrange(self.BUCKET_SIZE)
+            swaps.append((slot, self.table[slot]))
+            fingerprint, self.table[slot] = self.table[slot], fingerprint
+            index = self._alt_index(index, fingerprint)
+            if self._insert_into(index, fingerprint):
+                self.count += 1
+                return True
+        # Too full: undo the kicks so no resident item is lost
+        for slot, previous in reversed(swaps):
+            self.table[slot] = previous
+        return False
+    
+    def update(self, items):
+        """Bulk add; returns how many items could not be inserted"""
+        return sum(1 for item in items if not self.add(item))
+    
+    def __contains__(self, item):
+        fingerprint, index1 = self._fingerprint_and_index(item)
+        table = self.table
+        if any(table[slot] == fingerprint for slot in self._bucket(index1)):
+            return True
+        index2 = self._alt_index(index1, fingerprint)
+        return any(table[slot] == fingerprint for slot in self._bucket(index2))
+    
+    def remove(self, item):
+        """Delete one copy of an item that was added; returns False if absent"""
+        fingerprint, index1 = self._fingerprint_and_index(item)
+        for index in (index1, self._alt_index(index1, fingerprint)):
+            for slot in self._bucket(index):
+                if self.table[slot] == fingerprint:
+                    self.table[slot] = 0
+                    self.count -= 1
+                    return True
+        return False
+    
+    def __len__(self):
+        return self.count
+    
+    def memory_bytes(self):
+        return self.table.itemsize * len(self.table)
+    
+    def to_bytes(self):
+        return (self.HEADER.pack(self.MAGIC, self.num_buckets, self.fingerprint_bits, self.count)
+                + self.table.tobytes())
+    
+    @classmethod
+    def from_bytes(cls, data):
+        """Rebuild a filter; data may be bytes or a (read-only) mmap"""
+        magic, num_buckets, fingerprint_bits, count = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC:
+            raise ValueError("Not a CuckooFilter image")
+        cuckoo = cls.__new__(cls)
+        cuckoo.num_buckets, cuckoo.fingerprint_bits, cuckoo.count = num_buckets, fingerprint_bits, count
+        cuckoo._rng = random.Random(0)
+        body = memoryview(data)[cls.HEADER.size:]
+        if isinstance(data, mmap.mmap):
+            cuckoo.table = body.cast(cuckoo._typecode())
+        else:
+            cuckoo.table = array(cuckoo._typecode(), body.tobytes())
+        return cuckoo
+    
+    def save(self, path):
+        with open(path, 'wb') as filter_file:
+            filter_file.write(self.to_bytes())
+    
+    @classmethod
+    def load(cls, path, use_mmap=True):
+        """Load from disk; with use_mmap the table stays in the page cache (read-only)"""
+        with open(path, 'rb') as filter_file:
+            if use_mmap:
+                return cls.from_bytes(mmap.mmap(filter_file.fileno(), 0, access=mmap.ACCESS_READ))
+            return cls.from_bytes(filter_file.read())
+
+def benchmark_membership(num_keys=50_000, num_queries=50_000, error_rate=0.01):
+    """Compare fast_membership_test with Bloom and cuckoo filters"""
+    keys = [f"user-{i}" for i in range(num_keys)]
+    absent = [f"other-{i}" for i in range(num_queries)]
+    queries = keys[:num_queries // 2] + absent[:num_queries // 2]
+    results = {}
+    
+    start = time.perf_counter()
+    found = fast_membership_test(keys, queries)
+    elapsed = time.perf_counter() - start
+    results['set'] = {'seconds': elapsed, 'memory_bytes': sys.getsizeof(set(keys)),
+                      'fp_rate': 0.0, 'found': len(found)}
+    
+    for name, filter_class in (('bloom', BloomFilter), ('cuckoo', CuckooFilter)):
+        start = time.perf_counter()
+        membership = filter_class(num_keys, error_rate)
+        membership.update(keys)
+        found = [query for query in queries if query in membership]
+        elapsed = time.perf_counter() - start
+        false_positives = sum(1 for query in absent if query in membership)
+        results[name] = {'seconds': elapsed, 'memory_bytes': membership.memory_bytes(),
+                         'fp_rate': false_positives / len(absent), 'found': len(found)}
+    return results
+
+print(f"  Membership benchmark (50,000 keys, 50,000 queries, target FP rate 1%):")
+for name, result in benchmark_membership().items():
+    print(f"    {name:7}: {result['seconds']:.3f}s, {result['memory_bytes']:>9,} bytes "
+          f"(structure only), measured FP rate {result['fp_rate']:.4f}")
+
+deny_list = BloomFilter(capacity=1000, error_rate=0.001)
+deny_list.update(f"bad-{i}" for i in range(1000))
+with tempfile.TemporaryDirectory() as filter_dir:
+    filter_path = os.path.join(filter_dir, "deny.bloom")
+    deny_list.save(filter_path)
+    mapped = BloomFilter.load(filter_path)
+    print(f"  Memory-mapped Bloom filter: 'bad-7' in filter: {'bad-7' in mapped}, "
+          f"'good-7' in filter: {'good-7' in mapped}")
+    del mapped
+sessions = CuckooFilter(capacity=100)
+sessions.update(["s1", "s2", "s3"])
+sessions.remove("s2")
+print(f"  Cuckoo filter after deleting 's2': s1={'s1' in sessions}, s2={'s2' in sessions}")
+
+# Tip 5: A duplicate-removal engine for streams and unhashable records
+print(f"\n💡 Tip 5: Streaming Duplicate Removal")
+
+def canonical_bytes(obj):
+    """Deterministic, type-aware serialization: equal dicts/lists/sets give equal bytes
+    
+    Types are kept apart, so 1, 1.0 and True (or [1, 2] and (1, 2)) differ.
+    """
+    if isinstance(obj, dict):
+        entries = sorted((canonical_bytes(key), canonical_bytes(value)) for key, value in obj.items())
+        return b'{' + b','.join(key + b':' + value for key, value in entries) + b'}'
+    if isinstance(obj, list):
+        return b'[' + b','.join(canonical_bytes(item) for item in obj) + b']'
+    if isinstance(obj, tuple):
+        return b'(' + b','.join(canonical_bytes(item) for item in obj) + b')'
+    if isinstance(obj, (set, frozenset)):
+        return b'<' + b','.join(sorted(canonical_bytes(item) for item in obj)) + b'>'
+    return f"{type(obj).__name__}:{obj!r}".encode()
+
+def record_fingerprint(obj):
+    """128-bit digest of the canonical serialization"""
+    return hashlib.blake2b(canonical_bytes(obj), digest_size=16).digest()
+
+class Deduplicator:
+    """Order-preserving duplicate removal over any iterable
+    
+    Keys are type-aware in every mode, so 1, 1.0 and True stay distinct.
+    mode="memory": set of (type, key) for hashable keys, compared with ==;
+    unhashable keys (dicts, lists) are fingerprinted.
+    mode="external" and mode="bloom" compare record_fingerprint(key), the
+    canonical serialization (see canonical_bytes), since they cannot keep
+    the keys themselves.
+    mode="external": exact in bounded memory; records are hash-partitioned
+    into pickle spill files, deduplicated per partition and merged back in
+    input order (output starts once the input is consumed).
+    mode="bloom": one pass in fixed memory; a few unique records may be
+    dropped as false positives (about error_rate of them).
+    
+    With count_duplicates (memory/external), duplicate_counts says which
+    keys repeated and how often, the information find_duplicates in
+    _8_lists.py returns for a single list. That Counter grows with the
+    number of repeated keys, so turn it off to keep external mode bounded.
+    """
+    
+    def __init__(self, key=None, mode="memory", partitions=16, spill_dir=None,
+                 expected_items=1_000_000, error_rate=0.001, count_duplicates=True):
+        if mode not in ("memory", "external", "bloom"):
+            raise ValueError(f"Unknown mode: {mode}")
+        self.key = key
+        self.mode = mode
+        self.partitions = partitions
+        self.spill_dir = spill_dir
+        self.expected_items = expected_items
+        self.error_rate = error_rate
+        self.count_duplicates = count_duplicates
+        self.total = 0
+        self.unique = 0
+        self.duplicate_counts = Counter()  # key -> extra occurrences (memory/external)
+    
+    def _key_of(self, item):
+        return self.key(item) if self.key else item
+    
+    def _count_duplicate(self, key):
+        """Count a repeat under the key itself, or its fingerprint if unhashable"""
+        if not self.count_duplicates:
+            return
+        try:
+            self.duplicate_counts[key] += 1
+        except TypeError:
+            self.duplicate_counts[record_fingerprint(key)] += 1
+    
+    def stats(self):
+        return {'total': self.total, 'unique': self.unique, 'duplicates': self.total - self.unique}
+    
+    def run(self, iterable):
+        """Yield the first occurrence of every key, in input order"""
+        self.total = self.unique = 0
+        self.duplicate_counts = Counter()
+        if self.mode == "external":
+            yield from self._run_external(iterable)
+            return
+        if self.mode == "bloom":
+            seen_filter = BloomFilter(self.expected_items, self.error_rate)
+            for item in iterable:
+                self.total += 1
+                fingerprint = record_fingerprint(self._key_of(item))
+                if fingerprint not in seen_filter:
+                    seen_filter.add(fingerprint)
+                    self.unique += 1
+                    yield item
+            return
+        seen = set()
+        key_func = self.key
+        for item in iterable:
+            self.total += 1
+            key = key_func(item) if key_func else item
+            memory_key = (type(key), key)
+            try:
+                is_duplicate = memory_key in seen
+            except TypeError:  # Unhashable key: compare its fingerprint
+                memory_key = record_fingerprint(key)
+                is_duplicate = memory_key in seen
+            if is_duplicate:
+                self._count_duplicate(key)
+            else:
+                seen.add(memory_key)
+                self.unique += 1
+                yield item
+    
+    def _run_external(self, iterable):
+        with tempfile.TemporaryDirectory(dir=self.spill_dir) as work_dir:
+            spill_paths = [os.path.join(work_dir, f"part_{k}.pkl") for k in range(self.partitions)]
+            spill_files = [open(path, 'wb') for path in spill_paths]
+            try:
+                for sequence, item in enumerate(iterable):
+                    self.total += 1
+                    key = self._key_of(item)
+                    fingerprint = record_fingerprint(key)
+                    partition = int.from_bytes(fingerprint[:4], 'little') % self.partitions
+                    pickle.dump((sequence, fingerprint, key, item), spill_files[partition])
+            finally:
+                for spill_file in spill_files:
+                    spill_file.close()
+            
+            # One partition in memory at a time: keep first occurrences, sorted by position
+            survivor_paths = []
+            for k, path in enumerate(spill_paths):
+                first_seen = {}
+                with open(path, 'rb') as spill_file:
+                    while True:
+                        try:
+                            sequence, fingerprint, key, item = pickle.load(spill_file)
+                        except EOFError:
+                            break
+                        if fingerprint in first_seen:
+                            self._count_duplicate(key)
+                        else:
+                            first_seen[fingerprint] = (sequence, item)
+                survivor_path = os.path.join(work_dir, f"unique_{k}.pkl")
+                with open(survivor_path, 'wb') as survivor_file:
+                    for record in sorted(first_seen.values(), key=operator.itemgetter(0)):
+                        pickle.dump(record, survivor_file)
+                self.unique += len(first_seen)
+                survivor_paths.append(survivor_path)
+            
+            # k-way merge of the sorted partitions restores input order
+            def read_records(survivor_path):
+                with open(survivor_path, 'rb') as survivor_file:
+                    while True:
+                        try:
+                            yield pickle.load(survivor_file)
+                        except EOFError:
+                            return
+            for _, item in heapq.merge(*map(read_records, survivor_paths), key=operator.itemgetter(0)):
+                yield item
+
+def benchmark_deduplication(number=5):
+    """Time the three classic methods against each Deduplicator mode"""
+    methods = [
+        ("Set method", remove_duplicates_set),
+        ("Loop method", remove_duplicates_loop),
+        ("Dict method", remove_duplicates_dict),
+    ]
+    for mode in ("memory", "external", "bloom"):
+        engine = Deduplicator(mode=mode, expected_items=len(data_with_duplicates))
+        methods.append((f"Engine {mode}", lambda engine=engine: list(engine.run(data_with_duplicates))))
+    results = {}
+    for method_name, method_func in methods:
+        time_taken = timeit.timeit(method_func, number=number)
+        results[method_name] = (time_taken, len(method_func()))
+    return results
+
+print(f"  Removing duplicates from {len(data_with_duplicates):,} elements (5 runs):")
+for method_name, (time_taken, unique_count) in benchmark_deduplication().items():
+    print(f"    {method_name:16}: {time_taken:.4f} seconds, unique: {unique_count}")
+
+records = [{'id': 1, 'tags': ['a', 'b']}, {'tags': ['a', 'b'], 'id': 1}, {'id': 2, 'tags': []},
+           {'id': 1, 'tags': ['b', 'a']}]
+engine = Deduplicator()
+print(f"  Unhashable dict records: {list(engine.run(records))}")
+print(f"  Stats: {engine.stats()}")
+by_id = Deduplicator(key=operator.itemgetter('id'), mode="external", partitions=4)
+print(f"  Keyed by id (external mode): {list(by_id.run(records))}, "
+      f"duplicates per id: {dict(by_id.duplicate_counts)}")
+
 print("\n" + "=" * 70)
 print("🎉 Congratulations! You've complete")
\ No newline at end of file
@@ -14,6 +14,9 @@ Examples: "Hello", 'Python', "123", "user@email.com", "Welcome to programming!"
 
 import string
 import re
+import bisect
+import mmap
+import struct
 import sys
 import io
 import locale
@@ -22,6 +25,12 @@ import textwrap
 import difflib
 import json
 import csv
+import os
+import random
+import tempfile
+import timeit
+from array import array
+from collections import Counter, deque
 from datetime import datetime
 from string import Template
 
@@ -1087,6 +1096,110 @@ for str1, str2 in similarity_tests:
     similarity = (1 - distance / max_len) * 100 if max_len > 0 else 100
     print(f"  '{str1}' & '{str2}' → Distance: {distance}, Similarity: {similarity:.1f}%")
 
+# Faster edit distance: bit-parallel (Myers) and banded (Ukkonen)
+def myers_levenshtein(str1, str2, max_distance=None):
+    """Levenshtein distance with Myers' bit-parallel algorithm
+    
+    Each column of the DP table is kept as bit vectors, so one character of
+    str2 costs a handful of integer operations instead of len(str1) min()
+    calls. Patterns up to 64 characters fit in one machine word; longer
+    ones are handled block by block by Python's arbitrary-size ints. With
+    max_distance, returns None as soon as the result must exceed it.
+    """
+    if len(str1) < len(str2):
+        str1, str2 = str2, str1
+    pattern, text = str2, str1
+    m = len(pattern)
+    if m == 0:
+        distance = len(text)
+        return None if max_distance is not None and distance > max_distance else distance
+    
+    peq = {}  # character -> bitmask of its positions in the pattern
+    for position, char in enumerate(pattern):
+        peq[char] = peq.get(char, 0) | (1 << position)
+    
+    mask = (1 << m) - 1
+    last_bit = 1 << (m - 1)
+    positive_vertical, negative_vertical = mask, 0
+    score = m
+    remaining = len(text)
+    for char in text:
+        eq = peq.get(char, 0)
+        xv = eq | negative_vertical
+        xh = ((((eq & positive_vertical) + positive_vertical) & mask) ^ positive_vertical) | eq
+        positive_horizontal = (negative_vertical | ~(xh | positive_vertical)) & mask
+        negative_horizontal = positive_vertical & xh
+        if positive_horizontal & last_bit:
+            score += 1
+        elif negative_horizontal & last_bit:
+            score -= 1
+        positive_horizontal = ((positive_horizontal << 1) | 1) & mask
+        negative_horizontal = (negative_horizontal << 1) & mask
+        positive_vertical = (negative_horizontal | ~(xv | positive_horizontal)) & mask
+        negative_vertical = positive_horizontal & xv
+        remaining -= 1
+        # The score drops by at most one per remaining character
+        if max_distance is not None and score - remaining > max_distance:
+            return None
+    return score
+
+def banded_levenshtein(str1, str2, max_distance):
+    """Levenshtein distance if it is <= max_distance, else None (Ukkonen's band)
+    
+    Only cells within max_distance of the diagonal can lead to an answer
+    within the threshold, so each row costs O(max_distance), and the
+    search stops as soon as a whole band row exceeds the threshold.
+    """
+    if len(str1) < len(str2):
+        str1, str2 = str2, str1
+    n, m = len(str1), len(str2)
+    if n - m > max_distance:
+        return None
+    too_far = max_distance + 1
+    previous_row = [j if j <= max_distance else too_far for j in range(m + 1)]
+    current_row = [too_far] * (m + 1)
+    for i in range(1, n + 1):
+        c1 = str1[i - 1]
+        low, high = max(1, i - max_distance), min(m, i + max_distance)
+        current_row[low - 1] = i if low == 1 and i <= max_distance else too_far
+        row_min = current_row[low - 1]
+        for j in range(low, high + 1):
+            cost = previous_row[j - 1] + (c1 != str2[j - 1])
+            deletion = previous_row[j] + 1
+            insertion = current_row[j - 1] + 1
+            value = min(cost, deletion, insertion, too_far)
+            current_row[j] = value
+            if value < row_min:
+                row_min = value
+        if high < m:
+            current_row[high + 1] = too_far
+        if row_min > max_distance:
+            return None  # Early exit: every path already costs too much
+        previous_row, current_row = current_row, previous_row
+    distance = previous_row[m]
+    return distance if distance <= max_distance else None
+
+print(f"\n⚡ Faster Edit Distance:")
+for str1, str2 in similarity_tests:
+    print(f"  '{str1}' & '{str2}' → Myers: {myers_levenshtein(str1, str2)}, "
+          f"Banded (k=2): {banded_levenshtein(str1, str2, 2)}")
+
+def benchmark_edit_distance(pairs, number=20, max_distance=2):
+    """Time the classic DP against the bit-parallel and banded versions"""
+    functions = [
+        ("levenshtein_distance", lambda: [levenshtein_distance(a, b) for a, b in pairs]),
+        ("myers_levenshtein", lambda: [myers_levenshtein(a, b) for a, b in pairs]),
+        (f"banded (k={max_distance})", lambda: [banded_levenshtein(a, b, max_distance) for a, b in pairs]),
+    ]
+    return {name: timeit.timeit(function, number=number) for name, function in functions}
+
+benchmark_pairs = [("internationalization", "internationalisation"),
+                   ("performance engineering", "performance engineers"),
+                   ("levenshtein distance", "damerau levenshtein")] * 10
+print(f"  Benchmark ({len(benchmark_pairs)} pairs x 20 runs):")
+for name, seconds in benchmark_edit_distance(benchmark_pairs).items():
+    print(f"    {name:22}: {seconds:.4f} seconds")
+
 # String similarity using difflib
 print(f"\n🔍 String Similarity using difflib:")
 for str1, str2 in similarity_tests[:3]:
@@ -1164,6 +1277,520 @@ print(f"Text: '{kmp_text}'")
 print(f"Pattern: '{kmp_pattern}'")
 print(f"Matches at positions: {kmp_matches}")
 
+# Aho-Corasick: many patterns in a single pass over the text
+class AhoCorasick:
+    """Multi-pattern matching automaton (trie + failure links)
+    
+    Runs in O(len(text) + matches) no matter how many patterns it holds.
+    feed() keeps the automaton state between calls, so matches that
+    straddle chunk boundaries are still found when streaming a file.
+    Matches are (start, pattern) tuples with absolute stream offsets.
+    Non-overlapping mode reports leftmost-longest matches.
+    """
+    
+    def __init__(self, patterns, case_insensitive=False, overlapping=True):
+        self.case_insensitive = case_insensitive
+        self.overlapping = overlapping
+        self.goto = [{}]     # state -> {char: next state}
+        self.fail = [0]
+        self.depth = [0]
+        self.outputs = [[]]  # state -> patterns ending here, longest first
+        for pattern in patterns:
+            if pattern:
+                self._insert(pattern)
+        self._build_failure_links()
+        self.reset()
+    
+    def _insert(self, pattern):
+        state = 0
+        for char in self._fold(pattern):
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.depth.append(self.depth[state] + 1)
+                self.outputs.append([])
+            state = next_state
+        if pattern not in self.outputs[state]:
+            self.outputs[state].append(pattern)
+    
+    def _build_failure_links(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                # Inherit shorter patterns that end at the same place
+                self.outputs[child] = self.outputs[child] + self.outputs[self.fail[child]]
+        for output in self.outputs:
+            output.sort(key=len, reverse=True)
+    
+    def _fold(self, text):
+        if not self.case_insensitive:
+            return text
+        folded = text.lower()
+        if len(folded) == len(text):
+            return folded
+        # Rare characters lowercase to several chars; keep offsets aligned
+        return ''.join(c if len(c.lower()) != 1 else c.lower() for c in text)
+    
+    def reset(self):
+        """Forget the streaming state and start again at offset 0"""
+        self._state = 0
+        self._offset = 0
+        self._last_end = 0
+        self._pending = []  # Non-overlapping candidates not yet decided
+    
+    def _resolve(self, matches, horizon):
+        """Emit leftmost-longest candidates no future match can beat"""
+        pending = self._pending
+        while pending:
+            start, pattern = min(pending, key=lambda match: (match[0], -len(match[1])))
+            if start >= horizon:
+                break
+            matches.append((start, pattern))
+            self._last_end = start + len(pattern)
+            pending[:] = [match for match in pending if match[0] >= self._last_end]
+    
+    def feed(self, chunk):
+        """Scan the next chunk of a stream and return the matches it completes
+        
+        In non-overlapping mode a match is held back until no longer match
+        starting at the same place (or earlier) is still possible; call
+        flush() at the end of the stream to release the rest.
+        """
+        goto, fail, outputs, depth = self.goto, self.fail, self.outputs, self.depth
+        state, offset = self._state, self._offset
+        matches = []
+        for char in self._fold(chunk):
+            offset += 1
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if self.overlapping:
+                if outputs[state]:
+                    matches.extend((offset - len(pattern), pattern) for pattern in outputs[state])
+                continue
+            for pattern in outputs[state]:
+                if offset - len(pattern) >= self._last_end:
+                    self._pending.append((offset - len(pattern), pattern))
+            if self._pending:
+                # Any future match starts at or after offset - depth[state]
+                self._resolve(matches, offset - depth[state])
+        self._state, self._offset = state, offset
+        return matches
+    
+    def flush(self):
+        """Release the matches held back at the end of a stream"""
+        matches = []
+        self._resolve(matches, float('inf'))
+        return matches
+    
+    def search(self, text):
+        """All matches in a complete text"""
+        self.reset()
+        return self.feed(text) + self.flush()
+    
+    def scan_file(self, path, chunk_size=1 << 20, encoding='utf-8'):
+        """Yield matches from a file in one pass with bounded memory"""
+        self.reset()
+        with open(path, encoding=encoding, errors='replace') as text_file:
+            while True:
+                chunk = text_file.read(chunk_size)
+                if not chunk:
+                    break
+                yield from self.feed(chunk)
+        yield from self.flush()
+
+print(f"\n🧭 Aho-Corasick Multi-Pattern Search:")
+log_keywords = ["error", "err", "timeout", "out", "denied"]
+log_text = "ERROR: request timeout; access denied; retrying after error"
+matcher = AhoCorasick(log_keywords, case_insensitive=True)
+print(f"Keywords: {log_keywords}")
+print(f"Overlapping: {matcher.search(log_text)}")
+non_overlapping = AhoCorasick(log_keywords, case_insensitive=True, overlapping=False)
+print(f"Non-overlapping: {non_overlapping.search(log_text)}")
+
+matcher.reset()
+streamed = []
+for start in range(0, len(log_text), 7):  # Chunks split keywords apart
+    streamed.extend(matcher.feed(log_text[start:start + 7]))
+print(f"Streamed in 7-char chunks matches one-shot search: {streamed == matcher.search(log_text)}")
+
+with tempfile.TemporaryDirectory() as scan_dir:
+    log_path = os.path.join(scan_dir, 'app.log')
+    with open(log_path, 'w', encoding='utf-8') as log_file:
+        for line_number in range(2000):
+            log_file.write(f"{line_number} INFO ok\n" if line_number % 50 else f"{line_number} ERROR timeout\n")
+    file_hits = Counter(pattern for _, pattern in matcher.scan_file(log_path, chunk_size=4096))
+print(f"File scan keyword counts: {dict(file_hits)}")
+
+many_keywords = [f"user{n}" for n in range(0, 5000, 7)]
+search_text = " ".join(f"user{n}" for n in range(0, 2000, 3))
+multi_matcher = AhoCorasick(many_keywords)
+kmp_time = timeit.timeit(lambda: [kmp_search(search_text, keyword) for keyword in many_keywords[:50]], number=1)
+ac_time = timeit.timeit(lambda: multi_matcher.search(search_text), number=1)
+print(f"KMP, first 50 of {len(many_keywords)} keywords: {kmp_time:.4f} seconds")
+print(f"Aho-Corasick, all {len(many_keywords)} keywords:  {ac_time:.4f} seconds")
+
+# Precompiled single-pattern matchers: build the table once, search often
+class PatternMatcher:
+    """Base class for compiled matchers over str, bytes or memoryview
+    
+    Subclasses build their table in __init__ and implement _scan(), which
+    yields every (overlapping) match start inside text[start:end]. Text is
+    never sliced for in-memory searches, so a memoryview over a large
+    buffer is searched in place.
+    """
+    
+    def __init__(self, pattern):
+        if not pattern:
+            raise ValueError("pattern must not be empty")
+        self.is_text = isinstance(pattern, str)
+        self.pattern = pattern if self.is_text else bytes(pattern)
+    
+    def _check(self, text):
+        if isinstance(text, str) != self.is_text:
+            kind = "str" if self.is_text else "bytes-like"
+            raise TypeError(f"this matcher searches {kind} text")
+        if isinstance(text, memoryview) and text.format != 'B':
+            text = text.cast('B')
+        return text
+    
+    def _scan(self, text, start, end):
+        raise NotImplementedError
+    
+    def search(self, text, start=0):
+        """Offset of the first match at or after start, or -1"""
+        text = self._check(text)
+        return next(self._scan(text, start, len(text)), -1)
+    
+    def findall(self, text):
+        """All match offsets, overlapping ones included (like kmp_search)"""
+        text = self._check(text)
+        return list(self._scan(text, 0, len(text)))
+    
+    def count(self, text):
+        """Number of (overlapping) matches"""
+        text = self._check(text)
+        return sum(1 for _ in self._scan(text, 0, len(text)))
+    
+    def finditer(self, file_like, chunk_size=1 << 16):
+        """Yield match offsets from a binary or text stream in one pass
+        
+        Binary streams are read with readinto() into one reusable buffer;
+        only the last len(pattern) - 1 items are carried between chunks so
+        matches across chunk boundaries are still found.
+        """
+        overlap = len(self.pattern) - 1
+        base = 0  # Stream offset of the first item in the buffer
+        if hasattr(file_like, 'readinto') and not self.is_text:
+            buffer = bytearray(chunk_size + overlap)
+            view = memoryview(buffer)
+            kept = 0
+            while True:
+                read = file_like.readinto(view[kept:])
+                if not read:
+                    break
+                end = kept + read
+                for position in self._scan(view, 0, end):
+                    yield base + position
+                keep = min(overlap, end)
+                buffer[:keep] = view[end - keep:end]
+                base += end - keep
+                kept = keep
+            return
+        tail = self.pattern[:0]
+        while True:
+            chunk = file_like.read(chunk_size)
+            if not chunk:
+                break
+            window = tail + chunk
+            for position in self._scan(window, 0, len(window)):
+                yield base + position
+            keep = min(overlap, len(window))
+            tail = window[len(window) - keep:]
+            base += len(window) - keep
+
+class KMPMatcher(PatternMatcher):
+    """Knuth-Morris-Pratt with the failure table computed once"""
+    
+    def __init__(self, pattern):
+        super().__init__(pattern)
+        pattern = self.pattern
+        failure = [0] * len(pattern)
+        length = 0
+        for i in range(1, len(pattern)):
+            while length and pattern[i] != pattern[length]:
+                length = failure[length - 1]
+            if pattern[i] == pattern[length]:
+                length += 1
+            failure[i] = length
+        self.failure = failure
+    
+    def _scan(self, text, start, end):
+        pattern, failure = self.pattern, self.failure
+        m = len(pattern)
+        j = 0
+        for i in range(start, end):
+            char = text[i]
+            while j and char != pattern[j]:
+                j = failure[j - 1]
+            if char == pattern[j]:
+                j += 1
+                if j == m:
+                    yield i - m + 1
+                    j = failure[j - 1]
+
+class HorspoolMatcher(PatternMatcher):
+    """Boyer-Moore-Horspool: skips ahead using the window's last character"""
+    
+    def __init__(self, pattern):
+        super().__init__(pattern)
+        pattern = self.pattern
+        m = len(pattern)
+        if self.is_text:
+            self.skip = {}
+            for i, char in enumerate(pattern[:-1]):
+                self.skip[char] = m - 1 - i
+        else:
+            self.skip = [m] * 256
+            for i, byte in enumerate(pattern[:-1]):
+                self.skip[byte] = m - 1 - i
+    
+    def _scan(self, text, start, end):
+        pattern = self.pattern
+        m = len(pattern)
+        last, last_item = m - 1, pattern[-1]
+        skip = self.skip
+        shift = (lambda item: skip.get(item, m)) if self.is_text else skip.__getitem__
+        # str and bytes compare in place; memoryview slices are views, not copies
+        has_startswith = hasattr(text, 'startswith')
+        i = start
+        while i <= end - m:
+            item = text[i + last]
+            if item == last_item and (text.startswith(pattern, i) if has_startswith
+                                      else text[i:i + m] == pattern):
+                yield i
+            i += shift(item)
+
+MATCHERS = {'kmp': KMPMatcher, 'horspool': HorspoolMatcher}
+
+def compile_matcher(pattern, algorithm='horspool'):
+    """Build a reusable matcher ('kmp' or 'horspool') for one pattern"""
+    try:
+        matcher_class = MATCHERS[algorithm]
+    except KeyError:
+        raise ValueError(f"Unknown algorithm '{algorithm}', choose from {sorted(MATCHERS)}") from None
+    return matcher_class(pattern)
+
+print(f"\n🧱 Compiled Matchers:")
+kmp_matcher = compile_matcher(kmp_pattern, 'kmp')
+bmh_matcher = compile_matcher(kmp_pattern.encode())
+print(f"KMP findall: {kmp_matcher.findall(kmp_text)}")
+print(f"Horspool on memoryview: {bmh_matcher.findall(memoryview(kmp_text.encode()))}")
+print(f"First match: {kmp_matcher.search(kmp_text)}, count: {bmh_matcher.count(kmp_text.encode())}")
+stream_matches = list(bmh_matcher.finditer(io.BytesIO(kmp_text.encode() * 3), chunk_size=10))
+print(f"Streamed over 10-byte chunks: {stream_matches}")
+
+def str_find_all(text, pattern):
+    """Overlapping matches with a str.find loop"""
+    positions = []
+    position = text.find(pattern)
+    while position != -1:
+        positions.append(position)
+        position = text.find(pattern, position + 1)
+    return positions
+
+haystack = ("lorem ipsum dolor sit amet " * 2000) + "needle in a haystack"
+needle = "needle in a"
+needle_regex = re.compile(f"(?={re.escape(needle)})")
+haystack_bytes = memoryview(haystack.encode())
+kmp_needle = compile_matcher(needle, 'kmp')
+bmh_needle = compile_matcher(needle.encode())
+search_functions = {
+    "str.find loop": lambda: str_find_all(haystack, needle),
+    "re.finditer": lambda: [match.start() for match in needle_regex.finditer(haystack)],
+    "find_pattern_occurrences": lambda: find_pattern_occurrences(haystack, needle),
+    "kmp_search": lambda: kmp_search(haystack, needle),
+    "KMPMatcher": lambda: kmp_needle.findall(haystack),
+    "HorspoolMatcher (bytes)": lambda: bmh_needle.findall(haystack_bytes),
+}
+print(f"Benchmark: {len(haystack)} characters x 5 runs")
+for name, function in search_functions.items():
+    assert function() == [len(haystack) - 20]
+    print(f"  {name:26}: {timeit.timeit(function, number=5):.4f} seconds")
+
+# Suffix array: index a static corpus once, answer substring queries by binary search
+class SuffixArray:
+    """Sorted suffix offsets plus an LCP array over a str or bytes corpus
+    
+    Built by prefix doubling in O(n log^2 n); count() and locate() then cost
+    O(m log n) per query instead of a rescan of the whole text. The index
+    can be saved and memory-mapped back, so a large corpus is not reloaded
+    into Python objects on every run.
+    """
+    
+    HEADER = struct.Struct('<4sBxxxQQ')  # magic, is_str, suffix count, text bytes
+    MAGIC = b'SFX1'
+    
+    def __init__(self, text):
+        self.is_text = isinstance(text, str)
+        self.text = text if self.is_text else bytes(text)
+        self.suffixes = self._build_suffix_array(self.text)
+        self.lcp = self._build_lcp(self.text, self.suffixes)
+    
+    @staticmethod
+    def _build_suffix_array(text):
+        n = len(text)
+        suffixes = array('q', range(n))
+        if n < 2:
+            return suffixes
+        symbols = {symbol: rank for rank, symbol in enumerate(sorted(set(text)), 1)}
+        rank = [symbols[symbol] for symbol in text]
+        step = 1
+        while True:
+            # Sort by (rank of first half, rank of second half); 0 means past the end
+            key = [rank[i] * (n + 1) + (rank[i + step] if i + step < n else 0) for i in range(n)]
+            order = sorted(range(n), key=key.__getitem__)
+            new_rank = [0] * n
+            current = 1
+            new_rank[order[0]] = current
+            for previous, suffix in zip(order, order[1:]):
+                if key[suffix] != key[previous]:
+                    current += 1
+                new_rank[suffix] = current
+            rank = new_rank
+            if current == n or step >= n:
+                suffixes[:] = array('q', order)
+                return suffixes
+            step *= 2
+    
+    @staticmethod
+    def _build_lcp(text, suffixes):
+        """Kasai's algorithm: lcp[i] = common prefix of suffixes i-1 and i"""
+        n = len(suffixes)
+        lcp = array('q', bytes(8 * n))
+        rank = [0] * n
+        for index, suffix in enumerate(suffixes):
+            rank[suffix] = index
+        common = 0
+        for suffix in range(n):
+            if rank[suffix] == 0:
+                common = 0
+                continue
+            previous = suffixes[rank[suffix] - 1]
+            while (suffix + common < n and previous + common < n
+                   and text[suffix + common] == text[previous + common]):
+                common += 1
+            lcp[rank[suffix]] = common
+            if common:
+                common -= 1
+        return lcp
+    
+    def _bounds(self, pattern):
+        """Range of suffix-array slots whose suffixes start with pattern"""
+        if isinstance(pattern, str) != self.is_text:
+            raise TypeError("pattern and corpus must both be str or both bytes")
+        text, suffixes, m = self.text, self.suffixes, len(pattern)
+        if self.is_text:
+            prefix = lambda index: text[suffixes[index]:suffixes[index] + m]
+        else:
+            pattern = bytes(pattern)
+            prefix = lambda index: bytes(text[suffixes[index]:suffixes[index] + m])
+        slots = range(len(suffixes))
+        low = bisect.bisect_left(slots, pattern, key=prefix)
+        high = bisect.bisect_right(slots, pattern, lo=low, key=prefix)
+        return low, high
+    
+    def count(self, pattern):
+        """Number of (overlapping) occurrences of pattern"""
+        low, high = self._bounds(pattern)
+        return high - low
+    
+    def locate(self, pattern):
+        """Sorted offsets of every occurrence of pattern"""
+        low, high = self._bounds(pattern)
+        return sorted(self.suffixes[low:high])
+    
+    def __contains__(self, pattern):
+        return self.count(pattern) > 0
+    
+    def longest_repeated_substring(self):
+        """Longest substring occurring at least twice, with its offsets"""
+        if len(self.lcp) < 2:
+            return self.text[:0], []
+        best = max(range(len(self.lcp)), key=self.lcp.__getitem__)
+        length = self.lcp[best]
+        if not length:
+            return self.text[:0], []
+        start = self.suffixes[best]
+        substring = self.text[start:start + length]
+        return substring if self.is_text else bytes(substring), self.locate(substring)
+    
+    def save(self, path):
+        """Header, suffix array, LCP array, then the corpus as UTF-8/bytes"""
+        data = self.text.encode('utf-8') if self.is_text else self.text
+        with open(path, 'wb') as index_file:
+            index_file.write(self.HEADER.pack(self.MAGIC, self.is_text, len(self.suffixes), len(data)))
+            index_file.write(self.suffixes.tobytes())
+            index_file.write(self.lcp.tobytes())
+            index_file.write(data)
+    
+    @classmethod
+    def load(cls, path, use_mmap=True):
+        """Load a saved index; with use_mmap the arrays stay in the page cache
+        
+        Bytes corpora are searched straight from the mapping. A str corpus
+        has to be decoded back into memory since offsets are in characters.
+        """
+        with open(path, 'rb') as index_file:
+            data = (mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+                    if use_mmap else index_file.read())
+        magic, is_text, n, text_size = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC:
+            raise ValueError("Not a SuffixArray image")
+        view = memoryview(data)
+        offset = cls.HEADER.size
+        index = cls.__new__(cls)
+        index.is_text = bool(is_text)
+        index.suffixes = view[offset:offset + 8 * n].cast('q')
+        index.lcp = view[offset + 8 * n:offset + 16 * n].cast('q')
+        text = view[offset + 16 * n:offset + 16 * n + text_size]
+        index.text = str(text, 'utf-8') if index.is_text else text
+        return index
+
+print(f"\n🗂️ Suffix Array Index:")
+corpus = "banana bandana banana split"
+suffix_index = SuffixArray(corpus)
+print(f"Corpus: '{corpus}'")
+for query in ["ana", "band", "split", "apple"]:
+    print(f"  '{query}': count={suffix_index.count(query)}, at {suffix_index.locate(query)}")
+repeated, repeated_at = suffix_index.longest_repeated_substring()
+print(f"Longest repeated substring: '{repeated}' at {repeated_at}")
+
+with tempfile.TemporaryDirectory() as index_dir:
+    index_path = os.path.join(index_dir, 'corpus.sfx')
+    SuffixArray(corpus.encode()).save(index_path)
+    mapped_index = SuffixArray.load(index_path)
+    print(f"Memory-mapped bytes index: b'ana' at {mapped_index.locate(b'ana')}")
+    del mapped_index  # Release the mapping before the file is removed
+
+index_corpus = " ".join(f"record{n % 997} value{n % 13}" for n in range(3000))
+corpus_index = SuffixArray(index_corpus)
+index_queries = [f"record{n} " for n in range(0, 997, 10)]
+rescan_time = timeit.timeit(lambda: [str_find_all(index_corpus, query) for query in index_queries], number=3)
+index_time = timeit.timeit(lambda: [corpus_index.locate(query) for query in index_queries], number=3)
+print(f"{len(index_queries)} queries x 3 over {len(index_corpus)} characters:")
+print(f"  str.find rescans: {rescan_time:.4f} seconds")
+print(f"  suffix array:     {index_time:.4f} seconds")
+
 print("\n" + "=" * 50)
 print("1️⃣4️⃣ Advanced Text Processing")
 print("=" * 50)
@@ -1660,6 +2287,131 @@ for word in test_words:
     else:
         print(f"  '{word}' ❌ Incorrect - Suggestions: {suggestions}")
 
+# Indexed spell checker: exact hits from a hash set, suggestions from a
+# SymSpell-style deletion index instead of scanning the whole dictionary
+class SpellChecker:
+    """Prebuilt spell-check index with frequency-ranked suggestions
+    
+    Every dictionary word is indexed under all strings reachable by deleting
+    up to max_distance characters. Two words within that edit distance share
+    at least one such delete, so a lookup only verifies the few candidates
+    found under the query's own deletes.
+    """
+    
+    def __init__(self, max_distance=2):
+        self.max_distance = max_distance
+        self.frequencies = {}  # lowercase word -> frequency
+        self.deletes = {}      # delete variant -> list of words
+    
+    def _delete_variants(self, word):
+        variants = {word}
+        frontier = {word}
+        for _ in range(self.max_distance):
+            frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+            variants |= frontier
+        return variants
+    
+    def add_word(self, word, frequency=1):
+        """Add a word (or bump its frequency)"""
+        word = word.lower()
+        if word in self.frequencies:
+            self.frequencies[word] += frequency
+            return
+        self.frequencies[word] = frequency
+        for variant in self._delete_variants(word):
+            self.deletes.setdefault(variant, []).append(word)
+    
+    @classmethod
+    def from_words(cls, words, max_distance=2):
+        checker = cls(max_distance)
+        for word in words:
+            checker.add_word(word)
+        return checker
+    
+    @classmethod
+    def from_word_list(cls, path, max_distance=2, encoding='utf-8'):
+        """Build from a file with one 'word' or 'word frequency' per line"""
+        checker = cls(max_distance)
+        with open(path, encoding=encoding) as word_file:
+            for line in word_file:
+                parts = line.split()
+                if parts:
+                    frequency = int(parts[1]) if len(parts) > 1 else 1
+                    checker.add_word(parts[0], frequency)
+        return checker
+    
+    def save(self, path):
+        """Persist the words and the deletion index as JSON"""
+        with open(path, 'w', encoding='utf-8') as index_file:
+            json.dump({'max_distance': self.max_distance,
+                       'frequencies': self.frequencies,
+                       'deletes': self.deletes}, index_file)
+    
+    @classmethod
+    def load(cls, path):
+        """Load a saved index without rebuilding the deletes"""
+        with open(path, encoding='utf-8') as index_file:
+            data = json.load(index_file)
+        checker = cls(data['max_distance'])
+        checker.frequencies = data['frequencies']
+        checker.deletes = data['deletes']
+        return checker
+    
+    def __contains__(self, word):
+        return word.lower() in self.frequencies
+    
+    def __len__(self):
+        return len(self.frequencies)
+    
+    def suggest(self, word, max_suggestions=3):
+        """Words within max_distance, closest first, then most frequent"""
+        word = word.lower()
+        candidates = set()
+        for variant in self._delete_variants(word):
+            candidates.update(self.deletes.get(variant, ()))
+        ranked = []
+        for candidate in candidates:
+            distance = banded_levenshtein(word, candidate, self.max_distance)
+            if distance is not None:
+                ranked.append((distance, -self.frequencies[candidate], candidate))
+        ranked.sort()
+        return [candidate for _, _, candidate in ranked[:max_suggestions]]
+    
+    def check(self, word, max_suggestions=3):
+        """Same result shape as simple_spell_check: (is_correct, suggestions)"""
+        if word in self:
+            return True, []
+        return False, self.suggest(word, max_suggestions)
+
+word_list_text = "hello 120\nworld 300\npython 80\nprogramming 60\nprogram 90\ncomputer 70\nscience 50\nhelp 200\n"
+with tempfile.TemporaryDirectory() as spell_dir:
+    word_list_path = os.path.join(spell_dir, 'words.txt')
+    with open(word_list_path, 'w', encoding='utf-8') as word_file:
+        word_file.write(word_list_text)
+    spell_checker = SpellChecker.from_word_list(word_list_path)
+    index_path = os.path.join(spell_dir, 'spell_index.json')
+    spell_checker.save(index_path)
+    spell_checker = SpellChecker.load(index_path)
+
+print(f"\nIndexed Spell Checker ({len(spell_checker)} words, {len(spell_checker.deletes)} deletes):")
+for word in test_words + ["helo"]:
+    is_correct, suggestions = spell_checker.check(word)
+    if is_correct:
+        print(f"  '{word}' ✅ Correct")
+    else:
+        print(f"  '{word}' ❌ Incorrect - Suggestions: {suggestions}")
+
+word_rng = random.Random(42)
+benchmark_dictionary = sorted({''.join(word_rng.choices(string.ascii_lowercase, k=word_rng.randint(4, 10)))
+                               for _ in range(5000)})
+benchmark_checker = SpellChecker.from_words(benchmark_dictionary)
+lookup_words = ["wrold", "pythom", benchmark_dictionary[100][1:], benchmark_dictionary[500] + "x"]
+linear_time = timeit.timeit(lambda: [simple_spell_check(w, benchmark_dictionary) for w in lookup_words], number=3)
+indexed_time = timeit.timeit(lambda: [benchmark_checker.check(w) for w in lookup_words], number=3)
+print(f"  {len(benchmark_dictionary)}-word dictionary, {len(lookup_words)} lookups x 3:")
+print(f"    simple_spell_check: {linear_time:.4f} seconds")
+print(f"    SpellChecker.check: {indexed_time:.4f} seconds")
+
 # Challenge 4: Text statistics analyzer
 def advanced_text_statistics(text):
     """Advanced text statistics analysis"""